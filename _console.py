@@ -0,0 +1,10 @@
+"""
+Módulo: _console.py
+Descripción: Instancia única de la consola de Rich, compartida por todos los módulos.
+Así la detección de capacidades de la terminal se hace una sola vez y la salida
+de los distintos módulos no se intercala.
+"""
+
+from rich.console import Console
+
+console = Console()
@@ -0,0 +1,105 @@
+# cython: language_level=3
+"""
+Módulo: _ode_kernels.pyx
+Descripción: Bucles de Euler y Heun en Cython, opcionales.
+numerical_methods.py los usa cuando Numba no está disponible (o f no pudo compilarse):
+f sigue siendo la función de Python, pero el bucle, los índices y la aritmética de
+cada paso se ejecutan como C, sin el intérprete.
+
+Compilación (requiere Cython y un compilador de C):
+    cythonize -i _ode_kernels.pyx
+"""
+
+cimport cython
+from libc.math cimport fabs, isinf
+
+
+cdef inline double _compensated_add(double s, double* c, double delta) nogil:
+    """Suma compensada de Neumaier (ver numerical_methods._compensated_add): s + delta, error en c."""
+    cdef double t = s + delta
+    if isinf(t):
+        return t
+    if fabs(s) >= fabs(delta):
+        c[0] += (s - t) + delta
+    else:
+        c[0] += (delta - t) + s
+    return t
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def euler_kernel(object f, double x0, double y0, double h, Py_ssize_t n,
+                 double[::1] xs, double[::1] ys):
+    """Euler con n pasos desde (x0, y0). Escribe los n + 1 puntos en xs/ys (preasignados)."""
+    cdef Py_ssize_t i
+    cdef double curr_x = x0
+    cdef double curr_y = y0
+    cdef double s = y0, c = 0.0
+    xs[0] = x0
+    ys[0] = y0
+    for i in range(n):
+        s = _compensated_add(s, &c, h * <double>f(curr_x, curr_y))
+        curr_y = s + c
+        curr_x = x0 + (i + 1) * h
+        xs[i + 1] = curr_x
+        ys[i + 1] = curr_y
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def heun_kernel(object f, double x0, double y0, double h, Py_ssize_t n, int corrector_iterations,
+                double tol, double[::1] xs, double[::1] ys_single, double[::1] ys_iter):
+    """
+    Heun simple e iterado con n pasos desde (x0, y0). Con corrector_iterations == 1
+    ys_iter no se toca (ambas trayectorias coinciden) y puede ser el mismo arreglo que ys_single.
+    El corrector iterado se detiene cuando dos iterados difieren en menos de tol; entonces su
+    último k2 se reutiliza como k1 del paso siguiente.
+    """
+    cdef Py_ssize_t i
+    cdef int k
+    cdef double half_h = 0.5 * h
+    cdef double curr_x = x0
+    cdef double x_next, curr_y_single = y0, curr_y_iter = y0
+    cdef double k1, k2, base, y_iterated, y_prev
+    cdef double s_single = y0, c_single = 0.0, s_iter = y0, c_iter = 0.0
+    cdef bint track_iter = corrector_iterations > 1
+    cdef bint k1_reusable = False  # FSAL (ver numerical_methods.improved_euler_method)
+    cdef double k1_iter = 0.0
+
+    xs[0] = x0
+    ys_single[0] = y0
+    if track_iter:
+        ys_iter[0] = y0
+
+    for i in range(n):
+        x_next = x0 + (i + 1) * h
+
+        k1 = <double>f(curr_x, curr_y_single)
+        k2 = <double>f(x_next, curr_y_single + h * k1)
+        s_single = _compensated_add(s_single, &c_single, half_h * (k1 + k2))
+        curr_y_single = s_single + c_single
+
+        if track_iter:
+            if not k1_reusable:
+                k1_iter = <double>f(curr_x, curr_y_iter)
+            k2 = <double>f(x_next, curr_y_iter + h * k1_iter)
+            base = curr_y_iter + half_h * k1_iter
+            y_iterated = base + half_h * k2
+            k1_reusable = False
+            for k in range(corrector_iterations - 1):
+                y_prev = y_iterated
+                k2 = <double>f(x_next, y_prev)
+                y_iterated = base + half_h * k2
+                if fabs(y_iterated - y_prev) < tol:
+                    k1_reusable = True
+                    break
+            s_iter = _compensated_add(s_iter, &c_iter, half_h * (k1_iter + k2))
+            curr_y_iter = s_iter + c_iter
+            k1_iter = k2
+            ys_iter[i + 1] = curr_y_iter
+
+        curr_x = x_next
+        xs[i + 1] = curr_x
+        ys_single[i + 1] = curr_y_single
@@ -4,13 +4,163 @@ Descripción: Este módulo se encarga del análisis y conversión segura de func
 ingresadas por el usuario en formato string a expresiones ejecutables de Python/SymPy.
 """
 
+import concurrent.futures
+import functools
+import math
+import multiprocessing
+import os
+import re
+import signal
+import unicodedata
+from collections import OrderedDict
+import numpy as np
 import sympy as sp
 from typing import Callable, Tuple, Any, Optional
 
+# Numba es una dependencia opcional: si está instalada, f(x, y) se compila a código máquina.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# SymEngine (opcional) parsea expresiones en C++, mucho más rápido que sympify en entradas grandes.
+try:
+    import symengine as se
+except ImportError:
+    se = None
+
+# Firma de compilación de f(x, y). Al especificarla, Numba compila en el momento del parseo
+# y no en la primera llamada dentro del bucle de integración.
+_JIT_SIGNATURE = 'float64(float64, float64)'
+
+# Opciones de fastmath sin 'nnan' ni 'ninf': f puede producir inf/nan (ej. 1/0, sqrt(-1))
+# y esos valores deben propagarse tal cual para detectarlos después de la integración.
+_JIT_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+# Símbolos permitidos, creados una sola vez.
+# _X: variable independiente
+# _Y: variable dependiente
+_X, _Y = sp.symbols('x y')
+
+# Diccionario de contexto local para sympify.
+# Esto restringe qué se puede interpretar, mejorando la seguridad,
+# aunque 'sympify' sigue siendo potente.
+_ALLOWED_LOCALS = {
+    'x': _X,
+    'y': _Y,
+    'sin': sp.sin,
+    'cos': sp.cos,
+    'tan': sp.tan,
+    'exp': sp.exp,
+    'log': sp.log,
+    'sqrt': sp.sqrt,
+    'pi': sp.pi,
+    'e': sp.E
+}
+
+# Nombres de _ALLOWED_LOCALS que son funciones: deben ir seguidos de '('.
+_FUNCTION_NAMES = frozenset({'sin', 'cos', 'tan', 'exp', 'log', 'sqrt'})
+
+# Tokenizador compilado para rechazar entradas inválidas antes de llegar a sympify (costoso).
+# Los números van primero para que '1e5' no se lea como 1 seguido del identificador 'e5'.
+_TOKEN_RE = re.compile(r"""
+      \s+
+    | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    | (?P<name>[A-Za-z_]\w*)
+    | \*\* | [-+*/^(),]
+""", re.VERBOSE)
+
+# y(x) como función desconocida para dsolve.
+_Y_OF_X = sp.Function('y')(_X)
+
 class FunctionParserError(Exception):
     """Excepción personalizada para errores en el análisis de funciones."""
     pass
 
+def _normalize_expression(expression_str: str) -> str:
+    """
+    Clave canónica para los cachés, que también es el texto que se parsea: normaliza Unicode
+    (NFKC), recorre los tokens con _TOKEN_RE y escribe la potencia siempre como '**' (sympify
+    ya interpreta '^' igual), de modo que "x + y" y "x+y", o "x^2" y "x**2", comparten la
+    misma entrada. Los espacios se eliminan solo entre tokens que no se fusionan al unirlos:
+    "1 2", "x y" o "* *" conservan un espacio y siguen siendo inválidos, como en el original.
+    Si hay un carácter no permitido se devuelve el texto sin tokenizar, para que
+    _validate_tokens informe su posición en la entrada del usuario.
+    """
+    text = unicodedata.normalize('NFKC', expression_str)
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if match is None:
+            return text
+        pos = match.end()
+        token = match.group()
+        if token.isspace():
+            continue
+        if token == '^':
+            token = '**'
+        if tokens and _tokens_merge(tokens[-1], token):
+            tokens.append(' ')
+        tokens.append(token)
+    return ''.join(tokens)
+
+def _tokens_merge(left: str, right: str) -> bool:
+    """True si left + right, escritos juntos, se leerían como otros tokens (ej. '1' '2', '*' '*')."""
+    is_word = lambda token: token[0].isalnum() or token[0] in '_.'
+    return (is_word(left) and is_word(right)) or (left[-1] == '*' and right[0] == '*')
+
+def _validate_tokens(expression_str: str) -> None:
+    """
+    Recorre la expresión una sola vez con el tokenizador compilado y rechaza caracteres
+    o nombres fuera de _ALLOWED_LOCALS. No valida la sintaxis: eso lo hace sympify.
+    También rechaza la multiplicación implícita ("2x", "2 x", "x(y)", "(x)(y)") y una función
+    sin paréntesis ("sin x"): SymEngine las aceptaría y sympify no, y la entrada válida no
+    debe depender de si la dependencia opcional está instalada.
+
+    Raises:
+        FunctionParserError: Si aparece un carácter o un nombre no permitido, o dos operandos
+                             seguidos sin operador.
+    """
+    pos = 0
+    prev = None          # último token (sin espacios)
+    prev_ends_operand = False
+    while pos < len(expression_str):
+        match = _TOKEN_RE.match(expression_str, pos)
+        if match is None:
+            raise FunctionParserError(f"Carácter no permitido: '{expression_str[pos]}' (posición {pos + 1}).")
+        token = match.group()
+        name = match.group('name')
+        if name is not None and name not in _ALLOWED_LOCALS:
+            allowed = ', '.join(_ALLOWED_LOCALS)
+            raise FunctionParserError(f"Nombre desconocido detectado: '{name}'. Solo se permiten: {allowed}.")
+        if not token.isspace():
+            if prev in _FUNCTION_NAMES and token != '(':
+                raise FunctionParserError(f"Se esperaba '(' después de '{prev}' (posición {match.start() + 1}).")
+            starts_operand = name is not None or match.group('number') is not None or token == '('
+            if prev_ends_operand and starts_operand:
+                raise FunctionParserError(f"Falta un operador entre '{prev}' y '{token}' (posición {match.start() + 1}): "
+                                          f"la multiplicación se escribe con '*'.")
+            prev_ends_operand = (match.group('number') is not None or token == ')'
+                                 or (name is not None and name not in _FUNCTION_NAMES))
+            prev = token
+        pos = match.end()
+    if prev in _FUNCTION_NAMES:
+        raise FunctionParserError(f"Se esperaba '(' después de '{prev}'.")
+
+def _sympify(expression_str: str) -> sp.Expr:
+    """
+    Convierte el string a una expresión de SymPy.
+    Si SymEngine está disponible se parsea con él y se convierte directamente a SymPy;
+    ante cualquier fallo se usa sympify, que además da mensajes de error más claros.
+    """
+    if se is not None:
+        try:
+            return se.sympify(expression_str)._sympy_()
+        except Exception:
+            pass
+    return sp.sympify(expression_str, locals=_ALLOWED_LOCALS)
+
 def parse_function(expression_str: str) -> Callable[[float, float], float]:
     """
     Convierte una cadena de texto representando una función matemática f(x, y)
@@ -24,36 +174,31 @@ def parse_function(expression_str: str) -> Callable[[float, float], float]:
     
     Returns:
         Callable[[float, float], float]: Una función lambda que toma x e y como argumentos
-                                         y devuelve el valor evaluado.
+                                         y devuelve el valor evaluado. Su atributo `vec` es la
+                                         versión NumPy, que acepta arreglos de x e y, `jit`
+                                         la versión Numba (None si no está disponible) y `expr`
+                                         la expresión de SymPy.
+                                         Los errores de dominio no se capturan por llamada: con Numba
+                                         se obtiene inf/nan y en Python se propaga la excepción.
     
     Raises:
         FunctionParserError: Si la expresión es inválida o contiene símbolos no permitidos.
     """
+    # La misma expresión (ej. al reintentar con nuevos parámetros) reutiliza la función ya compilada.
+    return _compile_function(_normalize_expression(expression_str))
+
+@functools.lru_cache(maxsize=256)
+def _compile_function(expression_str: str) -> Callable[[float, float], float]:
+    """
+    Implementación cacheada de parse_function. La función devuelta no guarda estado,
+    por lo que es seguro compartirla entre llamadas. Los errores no se cachean.
+    """
     try:
-        # Definir los símbolos permitidos.
-        # x: variable independiente
-        # y: variable dependiente
-        x, y = sp.symbols('x y')
-        
-        # Diccionario de contexto local para sympify.
-        # Esto restringe qué se puede interpretar, mejorando la seguridad,
-        # aunque 'sympify' sigue siendo potente.
-        allowed_locals = {
-            'x': x,
-            'y': y,
-            'sin': sp.sin,
-            'cos': sp.cos,
-            'tan': sp.tan,
-            'exp': sp.exp,
-            'log': sp.log,
-            'sqrt': sp.sqrt,
-            'pi': sp.pi,
-            'e': sp.E
-        }
+        # Filtro previo barato: los errores de escritura no llegan a sympify.
+        _validate_tokens(expression_str)
 
         # Convertir el string a una expresión simbólica de SymPy.
-        # Se usa evaluate=False para simplemente parsear primero, aunque para lambdify no es estricto.
-        expr = sp.sympify(expression_str, locals=allowed_locals)
+        expr = _sympify(expression_str)
 
         # Verificar que no haya símbolos extraños que no sean x, y o constantes.
         # free_symbols devuelve el conjunto de símbolos en la expresión.
@@ -64,25 +209,18 @@ def parse_function(expression_str: str) -> Callable[[float, float], float]:
                  # pero si el usuario mete 'z', aquí lo detectamos.
                  raise FunctionParserError(f"Símbolo desconocido detectado: '{sym}'. Solo se permiten 'x' e 'y'.")
 
-        # Convertir la expresión simbólica a una función rápida de Python (usando numpy/math backend por defecto).
-        # "modules='math'" asegura que use math.sin, etc., para rendimiento y compatibilidad con floats estándar.
-        f_lambda = sp.lambdify((x, y), expr, modules='math')
+        if expr.has(sp.I):
+            raise FunctionParserError("La función debe ser real: se detectaron valores complejos.")
 
-        def safe_wrapper(val_x: float, val_y: float) -> float:
-            """Wrapper para capturar errores de dominio matemático (ej. div por cero) durante la ejecución."""
-            try:
-                # sp.lambdify a veces puede devolver tipos complejos o numpy, forzamos float nativo si es necesario
-                # y manejamos excepciones.
-                return float(f_lambda(val_x, val_y))
-            except ZeroDivisionError:
-                raise FunctionParserError(f"División por cero evaluando f({val_x}, {val_y})")
-            except ValueError as e:
-                # Errores como sqrt(-1) en dominio real
-                raise FunctionParserError(f"Error matemático evaluando f({val_x}, {val_y}): {e}")
-            except Exception as e:
-                raise FunctionParserError(f"Error inesperado evaluando función: {e}")
-
-        return safe_wrapper
+        # SymPy evalúa al parsear las divisiones por cero y similares (ej. x/0 -> zoo*x,
+        # 0/0 -> nan, log(0) -> zoo): f no está definida, y lambdify para NumPy no sabe
+        # imprimir zoo, así que se rechaza aquí con un mensaje claro.
+        if expr.has(sp.zoo, sp.nan):
+            raise FunctionParserError("La función no está definida: la expresión contiene un valor "
+                                      "infinito o indeterminado (ej. x/0, 0/0 o log(0)).")
+
+        # Strings distintos con la misma expresión (ej. "y + x" y "x + y") comparten la compilación.
+        return _lambdify_expression(expr)
 
     except sp.SympifyError as e:
         raise FunctionParserError(f"La expresión no es válida: {e}")
@@ -91,12 +229,264 @@ def parse_function(expression_str: str) -> Callable[[float, float], float]:
     except Exception as e:
         raise FunctionParserError(f"Error al procesar la función: {e}")
 
-import signal
+@functools.lru_cache(maxsize=256)
+def _lambdify_expression(expr: sp.Expr) -> Callable[[float, float], float]:
+    """
+    Genera las versiones llamables (math, Numba y NumPy) de una expresión ya validada.
+    Cacheada por la propia expresión de SymPy: lambdify y la compilación con Numba son lo
+    más costoso de parse_function.
+    """
+    # Convertir la expresión simbólica a una función rápida de Python (usando numpy/math backend por defecto).
+    # "modules='math'" asegura que use math.sin, etc., para rendimiento y compatibilidad con floats estándar.
+    # La eliminación de subexpresiones comunes (ej. x*y en sin(x*y) + cos(x*y)) se calcula
+    # una sola vez y la comparten las dos versiones generadas (math y numpy, más abajo).
+    cse_result = sp.cse(expr, list=False)
+    shared_cse = lambda _expr: cse_result
+    f_lambda = sp.lambdify((_X, _Y), expr, modules='math', cse=shared_cse)
+
+    # Si Numba está disponible, compilar la función generada por lambdify.
+    # No se usa cache=True: Numba no puede cachear en disco el código '<lambdifygenerated>'.
+    # Con error_model='numpy' la división por cero devuelve inf en lugar de lanzar una excepción.
+    # Si la compilación falla (ej. Piecewise), se conserva la versión Python.
+    is_compiled = False
+    if njit is not None:
+        try:
+            f_lambda = njit(_JIT_SIGNATURE, fastmath=_JIT_FASTMATH, error_model='numpy')(f_lambda)
+            is_compiled = True
+        except Exception:
+            pass
+
+    # Pre-calentamiento: una primera evaluación fuera del bucle de simulación.
+    # Si falla en (1, 1) no es necesariamente un error (ej. 1/log(x)), así que se ignora.
+    try:
+        f_lambda(1.0, 1.0)
+    except Exception:
+        pass
+
+    # Se devuelve la función directamente, sin wrapper con try/except por llamada.
+    # Los valores inf/nan se detectan una sola vez sobre el resultado de la simulación;
+    # en la versión Python, las excepciones (ej. ZeroDivisionError) llegan al llamador.
+
+    # Función compilada (el propio dispatcher, o None) para que los integradores
+    # ejecuten el bucle completo en Numba.
+    f_lambda.jit = f_lambda if is_compiled else None
+
+    # Versión vectorizada para evaluar f sobre arreglos completos en una sola llamada.
+    f_lambda.vec = sp.lambdify((_X, _Y), expr, modules='numpy', cse=shared_cse)
+
+    # Expresión simbólica, para generar otras versiones bajo demanda (ej. PyTorch en el barrido por lotes).
+    f_lambda.expr = expr
+
+    return f_lambda
+
+# Tiempo máximo (en segundos) para buscar la solución analítica.
+_EXACT_SOLVE_TIMEOUT = 3.0
+
+# Tiempo máximo (en segundos) para que el trabajador arranque e importe SymPy. Holgado: en
+# un equipo lento o con el disco frío la importación puede tardar varios segundos.
+_WORKER_START_TIMEOUT = 30.0
+
+# Proceso trabajador para dsolve. Se crea de forma perezosa en el primer uso.
+_executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+# PID del trabajador, informado por él mismo al arrancar (ver _worker_ready)
+_worker_pid: Optional[int] = None
+
+# Caché LRU de solve_exact_ode por (expresión normalizada, x0, y0). Es un OrderedDict y no
+# lru_cache porque exact_solution_is_cached necesita consultar si una clave está guardada.
+_EXACT_CACHE_SIZE = 32
+_exact_cache: "OrderedDict[Tuple[str, float, float], Optional[Tuple[Callable[[float], float], str]]]" = OrderedDict()
+
+def _get_executor() -> Optional[concurrent.futures.ProcessPoolExecutor]:
+    """
+    Devuelve el pool de un solo proceso usado para dsolve, creándolo si no existe, o None
+    si el trabajador no arrancó dentro de _WORKER_START_TIMEOUT (se termina y se descarta).
+    El trabajador se inicia con 'spawn' y no con fork: tras un barrido en paralelo
+    (numerical_methods._get_euler_batch_kernel) el proceso tiene los hilos de Numba (TBB)
+    en marcha, y un fork de un proceso con esos hilos lo deja bloqueado al salir.
+    """
+    global _executor, _worker_pid
+    if _executor is None:
+        _executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        # Con 'spawn' el hijo importa este módulo (y con él SymPy) al recibir su primera tarea:
+        # una tarea propia del módulo hace esa importación aquí, fuera del timeout de dsolve.
+        children_before = set(multiprocessing.active_children())
+        try:
+            _worker_pid = _executor.submit(_worker_ready).result(timeout=_WORKER_START_TIMEOUT)
+        except (concurrent.futures.TimeoutError, concurrent.futures.process.BrokenProcessPool):
+            # Sin PID informado todavía: el trabajador es el hijo nuevo de multiprocessing
+            for process in set(multiprocessing.active_children()) - children_before:
+                process.terminate()
+            _reset_executor(terminate=False)
+            return None
+    return _executor
+
+def _worker_ready() -> int:
+    """Tarea de arranque del trabajador (ver _get_executor): devuelve el PID del proceso."""
+    return os.getpid()
+
+def _reset_executor(terminate: bool = True) -> None:
+    """
+    Termina el proceso trabajador (ej. tras un timeout) y descarta el pool.
+    shutdown() por sí solo no interrumpe un dsolve en curso, por eso se termina el proceso
+    por su PID. Con terminate=False (el trabajador ya murió) solo se descarta el pool.
+    """
+    global _executor, _worker_pid
+    if _executor is None:
+        return
+    if terminate and _worker_pid is not None:
+        try:
+            os.kill(_worker_pid, signal.SIGTERM)
+        except OSError:
+            # El proceso ya terminó por su cuenta
+            pass
+    _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+    _worker_pid = None
+
+# Constante de integración que usan dsolve y _solve_simple_ode en la solución general
+_C1 = sp.Symbol('C1')
+
+def _solve_simple_ode(f_sym: sp.Expr) -> Optional[sp.Expr]:
+    """
+    Solución general, sin dsolve, de los casos de libro de texto más comunes:
+        - y' = g(x):          y = C1 + ∫ g(x) dx
+        - y' = a*y + b(x):    y = e^{a x} * (C1 + ∫ e^{-a x} b(x) dx)  (a constante)
+
+    Returns:
+        sp.Expr: La solución general (en función de x y C1), o None si no aplica o la
+                 integral no tiene forma cerrada.
+    """
+    if _Y not in f_sym.free_symbols:
+        solution = _C1 + sp.integrate(f_sym, _X)
+    else:
+        a = sp.diff(f_sym, _Y)
+        if a.free_symbols:
+            # No lineal en y, o coeficiente que depende de x: se deja a dsolve
+            return None
+        b = sp.expand(f_sym - a * _Y)
+        if _Y in b.free_symbols:
+            return None
+        solution = sp.exp(a * _X) * (_C1 + sp.integrate(sp.exp(-a * _X) * b, _X))
+
+    # Integral sin forma cerrada: se deja a dsolve
+    if solution.has(sp.Integral):
+        return None
+    return solution
+
+def _dsolve_general(expression_str: str) -> Tuple[str, ...]:
+    """
+    Se ejecuta en el proceso trabajador: solución general de y' = f(x, y), sin condición inicial.
+    Los casos simples se resuelven por integración directa antes de recurrir a dsolve.
+
+    Returns:
+        Tuple[str, ...]: srepr de cada solución (dsolve puede devolver varias ramas), para
+                         reconstruirlas en el proceso principal.
+    """
+    # Parsear sympy expression
+    f_sym = _sympify(expression_str)
+
+    simple = _solve_simple_ode(f_sym)
+    if simple is not None:
+        return (sp.srepr(simple),)
+
+    ode_eq = sp.Eq(_Y_OF_X.diff(_X), f_sym.subs(_Y, _Y_OF_X))
+
+    # Resolver
+    sol = sp.dsolve(ode_eq, _Y_OF_X)
+    if not isinstance(sol, list):
+        sol = [sol]
+
+    return tuple(sp.srepr(s.rhs) for s in sol)
+
+def _value_at(expr: sp.Expr, x0: float) -> sp.Expr:
+    """expr evaluada en x = x0; si la sustitución directa se indetermina (ej. x*log(x) en 0) usa el límite."""
+    value = expr.xreplace({_X: sp.Float(x0)})
+    if value.has(sp.nan, sp.zoo):
+        value = sp.limit(expr, _X, x0)
+    return value
+
+def _is_close(a: complex, b: float) -> bool:
+    return abs(a - b) <= 1e-9 * (1.0 + abs(b))
+
+def _apply_initial_condition(expression_str: str, general_srepr: Tuple[str, ...],
+                             x0: float, y0: float) -> Optional[str]:
+    """
+    Se ejecuta en el proceso trabajador: despeja C1 de y(x0) = y0 en la solución general.
+    Es solo álgebra (solve + xreplace), pero sigue bajo el mismo timeout que dsolve.
+
+    Returns:
+        str: srepr de la solución particular, o None si ninguna rama cumple la condición inicial.
+    """
+    f_sym = _sympify(expression_str)
+    slope0 = complex(f_sym.xreplace({_X: sp.Float(x0), _Y: sp.Float(y0)}).evalf())
+
+    for branch in general_srepr:
+        general = sp.sympify(branch)
+        if _C1 not in general.free_symbols:
+            candidates = [general]
+        else:
+            candidates = [general.xreplace({_C1: c})
+                          for c in sp.solve(sp.Eq(_value_at(general, x0), y0), _C1)]
+
+        for particular in candidates:
+            if particular.has(sp.oo, -sp.oo, sp.zoo, sp.nan, sp.I):
+                continue
+            # Verificación numérica: descarta raíces espurias de solve y, cuando dsolve da
+            # varias ramas (ej. y' = sqrt(y)), la que no cumple y'(x0) = f(x0, y0).
+            if not _is_close(complex(_value_at(particular, x0).evalf()), y0):
+                continue
+            slope = complex(_value_at(particular.diff(_X), x0).evalf())
+            if all(map(math.isfinite, (slope.real, slope.imag, slope0.real, slope0.imag))) \
+                    and not _is_close(slope, slope0.real):
+                continue
+            return sp.srepr(sp.expand(particular))
+    return None
+
+def _run_in_worker(func: Callable, *args: Any) -> Any:
+    """
+    Ejecuta func(*args) en el proceso trabajador con el timeout de la solución exacta.
+    Ante timeout, caída del proceso o un trabajador que no arrancó lanza TimeoutError.
+    """
+    executor = _get_executor()
+    if executor is None:
+        raise TimeoutError("El proceso de la solución exacta no arrancó a tiempo")
+    try:
+        # submit también puede lanzar BrokenProcessPool si el trabajador murió entre llamadas
+        future = executor.submit(func, *args)
+        return future.result(timeout=_EXACT_SOLVE_TIMEOUT)
+    except concurrent.futures.TimeoutError:
+        _reset_executor()
+        raise TimeoutError("Se excedió el tiempo límite de la solución exacta")
+    except concurrent.futures.process.BrokenProcessPool:
+        # El trabajador ya no existe: su PID podría reutilizarse, no se envía la señal
+        _reset_executor(terminate=False)
+        raise TimeoutError("El proceso de la solución exacta terminó inesperadamente")
+
+@functools.lru_cache(maxsize=32)
+def _general_solution_cached(expression_str: str) -> Optional[Tuple[str, ...]]:
+    """
+    Solución general cacheada por expresión normalizada: la integración simbólica (dsolve)
+    solo se hace una vez por f, aunque el usuario reintente con otras condiciones iniciales.
+    Se cachea también la ausencia de forma cerrada (None); un timeout no se cachea
+    (TimeoutError se propaga), para que el siguiente intento vuelva a probar dsolve.
+    """
+    try:
+        return _run_in_worker(_dsolve_general, expression_str)
+    except TimeoutError:
+        raise
+    except Exception:
+        return None
 
 def solve_exact_ode(expression_str: str, x0: float, y0: float) -> Optional[Tuple[Callable[[float], float], str]]:
     """
     Intenta encontrar la solución analítica exacta para y' = f(x, y) con y(x0) = y0.
     INCLUYE TIMEOUT DE 3 SEGUNDOS para evitar bloqueos en EDOs complejas.
+    dsolve se ejecuta en un proceso aparte, de modo que el timeout funciona en cualquier
+    plataforma y el proceso se termina si se excede el límite.
+    La solución general se cachea por expresión normalizada; para cada (x0, y0) solo se
+    despeja la constante C1. La solución particular también se cachea (ver
+    exact_solution_is_cached); un timeout no se cachea.
     
     Args:
         expression_str: String de f(x, y)
@@ -106,54 +496,84 @@ def solve_exact_ode(expression_str: str, x0: float, y0: float) -> Optional[Tuple
         (Callable, str): Tupla con (función lambda, representación string) si tiene éxito.
         None: Si falla/timeout.
     """
-    
-    # Identificar si podemos usar señales (Unix-only) para timeout
-    has_alarm = hasattr(signal, 'SIGALRM')
-    
-    # Manejador para el timeout
-    def handler(signum, frame):
-        raise TimeoutError("Cálculo excedió el tiempo límite.")
+    key = (_normalize_expression(expression_str), x0, y0)
+    if key in _exact_cache:
+        _exact_cache.move_to_end(key)
+        return _exact_cache[key]
+    try:
+        result = _solve_particular(*key)
+    except TimeoutError:
+        # Un timeout puede deberse a la carga del momento: no queda en caché
+        return None
+    _exact_cache[key] = result
+    if len(_exact_cache) > _EXACT_CACHE_SIZE:
+        _exact_cache.popitem(last=False)
+    return result
+
+def exact_solution_is_cached(expression_str: str, x0: float, y0: float) -> bool:
+    """
+    True si solve_exact_ode(expression_str, x0, y0) responderá desde el caché, sin esperar
+    al proceso trabajador (ej. para decidir si mostrar un indicador de progreso).
+    """
+    return (_normalize_expression(expression_str), x0, y0) in _exact_cache
+
+def _solve_particular(expression_str: str, x0: float, y0: float) -> Optional[Tuple[Callable[[float], float], str]]:
+    """
+    Implementación de solve_exact_ode (sin caché de la solución particular). TimeoutError
+    se propaga para que no se cachee; cualquier otro fallo se devuelve como None.
+    """
+    general_srepr = _general_solution_cached(expression_str)
+    if general_srepr is None:
+        return None
 
     try:
-        # Configurar alarma de 3 segundos solo si existe SIGALRM
-        if has_alarm:
-            signal.signal(signal.SIGALRM, handler)
-            signal.alarm(3)
-        
-        try:
-            x = sp.symbols('x')
-            y = sp.Function('y')(x)
-            
-            # Parsear sympy expression
-            local_dict = {'x': x, 'y': y, 'e': sp.E, 'pi': sp.pi}
-            f_sym = sp.sympify(expression_str, locals={'x': x, 'y': sp.symbols('y'), 'e': sp.E})
-            ode_eq = sp.Eq(y.diff(x), f_sym.subs(sp.symbols('y'), y))
-            
-            # Resolver
-            sol = sp.dsolve(ode_eq, y, ics={y.subs(x, x0): y0})
-            
-            if isinstance(sol, list):
-                sol = sol[0]
-                
-            rhs = sol.rhs
-            real_lambda = sp.lambdify(x, rhs, modules='math')
-            
-            def safe_real_y(val_x: float) -> float:
-                try:
-                    return float(real_lambda(val_x))
-                except Exception:
-                    return float('nan')
-                    
-            return safe_real_y, str(rhs)
-            
-        finally:
-            # Desactivar alarma pase lo que pase si se usó
-            if has_alarm:
-                signal.alarm(0)
+        rhs_srepr = _run_in_worker(_apply_initial_condition, expression_str, general_srepr, x0, y0)
+        if rhs_srepr is None:
+            return None
+
+        rhs = sp.sympify(rhs_srepr)
+        # Versión NumPy: una sola llamada evalúa la solución en todo el arreglo de x.
+        real_vec = sp.lambdify(_X, rhs, modules='numpy')
+        real_scalar = sp.lambdify(_X, rhs, modules='math')
+
+        def scalar_real_y(val_x: float) -> float:
+            try:
+                return float(real_scalar(val_x))
+            except Exception:
+                return float('nan')
+
+        def safe_real_y(val_x):
+            """y(x) para un escalar o un arreglo de x; nan donde la solución no está definida."""
+            xs = np.asarray(val_x, dtype=float)
+            try:
+                with np.errstate(all='ignore'):
+                    values = np.asarray(real_vec(xs), dtype=float)
+                # Una solución constante devuelve un escalar: se expande a la forma de x
+                values = np.array(np.broadcast_to(values, xs.shape))
+            except Exception:
+                # Funciones sin equivalente en NumPy o resultados complejos: punto a punto,
+                # escribiendo directo en el arreglo de salida (sin lista intermedia)
+                values = np.fromiter(map(scalar_real_y, xs.ravel().tolist()),
+                                     dtype=float, count=xs.size).reshape(xs.shape)
+            return float(values) if values.ndim == 0 else values
+
+        return safe_real_y, str(rhs)
 
     except TimeoutError:
-        # El llamador manejará el None mostrando un mensaje de advertencia si desea
-        return None
-        
+        raise
     except Exception:
+        # El llamador manejará el None mostrando un mensaje de advertencia si desea
         return None
+
+# Permiten vaciar los cachés (ej. en pruebas) sin acceder a las funciones internas.
+def _clear_parse_caches() -> None:
+    _compile_function.cache_clear()
+    _lambdify_expression.cache_clear()
+
+parse_function.cache_clear = _clear_parse_caches
+
+def _clear_exact_caches() -> None:
+    _exact_cache.clear()
+    _general_solution_cached.cache_clear()
+
+solve_exact_ode.cache_clear = _clear_exact_caches
@@ -5,16 +5,16 @@ Utiliza 'rich' para prompts estéticos cuando sea posible, aunque input() están
 """
 
 from typing import Callable, Optional, Tuple
-from rich.console import Console
-from rich.prompt import Prompt, FloatPrompt, IntPrompt
-from function_parser import parse_function, FunctionParserError
+from _console import console
 
-console = Console()
 
 def get_int(prompt_text: str, min_val: Optional[int] = None, max_val: Optional[int] = None, default: Optional[int] = None) -> int:
     """
     Solicita al usuario un número entero.
     """
+    # Import perezoso: rich.prompt solo se necesita aquí (muestra el valor por defecto).
+    from rich.prompt import IntPrompt
+
     while True:
         val = IntPrompt.ask(prompt_text, default=default)
         if min_val is not None and val < min_val:
@@ -39,8 +39,8 @@ def get_float(prompt_text: str, min_val: Optional[float] = None, greater_than: O
     """
     while True:
         try:
-            # Usamos FloatPrompt de Rich para una experiencia input robusta
-            val = FloatPrompt.ask(prompt_text)
+            # console.input + float() en lugar de FloatPrompt: sin construir un Prompt por llamada
+            val = float(console.input(f"{prompt_text}: "))
             
             if min_val is not None and val < min_val:
                 console.print(f"[bold red]Error:[/bold red] El valor debe ser mayor o igual a {min_val}.")
@@ -64,20 +64,14 @@ def get_function_input(prompt_text: str) -> Tuple[Callable[[float, float], float
     Returns:
         Tuple[Callable, str]: Retorna la función 'compilada' y el string original.
     """
+    # Import perezoso: function_parser carga SymPy, que es costoso al iniciar la aplicación.
+    from function_parser import parse_function, FunctionParserError
+
     while True:
-        func_str = Prompt.ask(prompt_text)
+        func_str = console.input(f"{prompt_text}: ")
         try:
+            # parse_function ya hace la validación sintáctica y una evaluación de prueba en (1, 1).
             func = parse_function(func_str)
-            
-            # Prueba rápida para verificar que no explota inmediatamente con valores simples (0,0) o (1,1)
-            # Esto es solo un 'smoke test' opcional, pero ayuda a detectar typos graves.
-            try:
-                func(1.0, 1.0)
-            except Exception:
-                # Si falla al evaluar en 1,1 no necesariamente es error (ej. 1/log(1)), así que no bloqueamos,
-                # pero confiamos en que parse_function ya hizo validación sintáctica.
-                pass
-                
             return func, func_str
         except FunctionParserError as e:
             console.print(f"[bold red]Error de Función:[/bold red] {e}")
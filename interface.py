@@ -4,24 +4,52 @@ Descripción: Centraliza toda la lógica de presentación y menús de la aplicac
 Reemplaza a output_formatter.py y absorbe la lógica visual de main.py.
 """
 
-from rich.console import Console
+from __future__ import annotations
+
+from _console import console
 from rich.table import Table
 from rich.panel import Panel
-from typing import Dict, Any, Optional
-import math
+from rich.text import Text
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Optional, Tuple
+import contextlib
 import sys
 
-# Instancia global de consola
-console = Console()
+# NumPy solo se importa al mostrar resultados: el menú principal (y salir) no paga ese costo.
+if TYPE_CHECKING:
+    import numpy as np
+
+
+_readline = sys.stdin.readline
+
+# Elementos estáticos, construidos una sola vez para no re-parsear markup en cada redibujado.
+_HEADER_PANEL = Panel.fit(
+    "[bold]Solucionador Numérico de EDOs[/bold]\n"
+    "Métodos de Euler y Euler Mejorado (Heun)",
+    border_style="green"
+)
+
+_MAIN_MENU = Text.from_markup(
+    "\n[bold]Seleccione el Método Numérico:[/bold]\n"
+    "1. Método de Euler\n"
+    "2. Método de Euler Mejorado (Heun)\n"
+    "3. Barrido de parámetros (Euler por lotes)\n"
+    "4. [red]Salir[/red]"
+)
+
+_POST_CALC_MENU = Text.from_markup(
+    "\n[bold]¿Qué desea hacer?[/bold]\n"
+    "1. Reintentar por Euler (Misma función, nuevos parámetros)\n"
+    "2. Reintentar por Heun (Misma función, nuevos parámetros)\n"
+    "3. Graficar Resultados\n"
+    "4. Graficar Errores\n"
+    "5. Regresar al Menú Principal\n"
+    "6. [red]Salir de la Aplicación[/red]"
+)
 
 def show_header():
     """Muestra el banner principal."""
     console.rule()
-    console.print(Panel.fit(
-        "[bold]Solucionador Numérico de EDOs[/bold]\n"
-        "Métodos de Euler y Euler Mejorado (Heun)",
-        border_style="green"
-    ))
+    console.print(_HEADER_PANEL)
 
 def show_function_panel(func_str: str):
     """Muestra el panel con la EDO original."""
@@ -47,167 +75,269 @@ def show_error(message: str):
     """Muestra un mensaje de error estandarizado."""
     console.print(f"[bold red]Error:[/bold red] {message}")
 
+def show_warning(message: str):
+    """Muestra una advertencia estandarizada."""
+    console.print(f"[bold yellow]Advertencia:[/bold yellow] {message}")
+
 def show_info(message: str):
     """Muestra un mensaje de información/warning estandarizado."""
     console.print(f"[green]{message}[/green]")
 
-def display_summary(x0: float, y0: float, x_final: float, h: float, func_str: str):
-    """Muestra resumen de parámetros."""
-    import math
+def display_summary(x0: float, y0: float, x_final: float, h: float, func_str: str, n_steps: int):
+    """Muestra resumen de parámetros. n_steps es el mismo número de pasos usado en la simulación."""
     console.print("\n[bold underline]Resumen de Parámetros:[/bold underline]")
     console.print(f" • EDO: [bold]y' = {func_str}[/bold]")
     console.print(f" • Condición Inicial: y({x0}) = {y0}")
     console.print(f" • Intervalo: [{x0}, {x_final}]")
     console.print(f" • Paso (h): {h}")
     
-    # Cálculo más preciso del número de pasos
-    num_steps = math.ceil((x_final - x0) / h)
-    actual_x_final = x0 + num_steps * h
-    console.print(f" • Pasos: {num_steps}")
+    actual_x_final = x0 + n_steps * h
+    console.print(f" • Pasos: {n_steps}")
     console.print(f" • Intervalo real: [{x0}, {actual_x_final:.6g}]")
     console.print("")
 
+def _format_values(values: np.ndarray, fmt_num: Callable[[float], str],
+                   nan_rows: Optional[List[int]] = None) -> List[str]:
+    """
+    Formatea una columna numérica completa con `fmt_num`; nan se muestra como 'N/A'.
+    nan_rows (índices con nan) puede venir ya calculado para no recorrer la columna otra vez.
+    """
+    import numpy as np
+    formatted = list(map(fmt_num, values.tolist()))
+    if nan_rows is None:
+        nan_rows = np.flatnonzero(np.isnan(values)).tolist()
+    for i in nan_rows:
+        formatted[i] = "N/A"
+    return formatted
+
+def _format_errors(err: np.ndarray, fmt_err: Callable[[float], str],
+                   zero_rows: List[int], nan_rows: List[int]) -> List[str]:
+    """
+    Formatea una columna de error relativo porcentual ya calculada (ver simulation.py).
+    '~0' en zero_rows (valor verdadero prácticamente cero) y 'N/A' en nan_rows (no existe).
+    Las máscaras de filas se calculan una sola vez por tabla y se comparten entre columnas.
+    """
+    formatted = list(map(fmt_err, err.tolist()))
+    for i in zero_rows:
+        formatted[i] = "~0"
+    for i in nan_rows:
+        formatted[i] = "N/A"
+    return formatted
+
+# Filas aproximadas de la tabla: con más pasos se muestra uno de cada `stride` (más el último)
+_TABLE_MAX_ROWS = 200
+
+def _sampled_rows(n_rows: int) -> Tuple[Optional[np.ndarray], int]:
+    """
+    Filas a mostrar de una tabla de n_rows: una de cada `stride`, siempre con la última.
+    Devuelve (índices, stride); los índices son None si caben todas (stride == 1).
+    """
+    import numpy as np
+    stride = max(1, n_rows // _TABLE_MAX_ROWS)
+    if stride == 1:
+        return None, 1
+    rows = np.arange(0, n_rows, stride)
+    if rows[-1] != n_rows - 1:
+        rows = np.append(rows, n_rows - 1)
+    return rows, stride
+
 def display_results(sim_data: Dict[str, Any], h: float, decimals: int = 8):
     """
     Genera la tabla de resultados basada en los datos de simulation.py.
+    Cada columna se formatea completa y luego se arma la tabla fila por fila. Las columnas
+    usan no_wrap: los números nunca se parten en varias líneas y Rich no calcula el ajuste
+    de línea de cada celda al dibujar la tabla.
+    Con muchos pasos la tabla se submuestrea (ver _TABLE_MAX_ROWS): solo se formatean
+    las filas mostradas.
     """
+    import numpy as np
     error = sim_data.get('error')
     if error:
         show_error(f"Error en simulación: {error}")
         return
 
-    euler_points = sim_data.get('euler_points')
-    heun_points = sim_data.get('heun_points')
-    heun_points_iterated = sim_data.get('heun_points_iterated')
+    x_vals = sim_data.get('x_values')
+    y_eu = sim_data.get('euler_values')
+    y_imp = sim_data.get('heun_values')
+    y_iter = sim_data.get('heun_values_iterated')
     real_values = sim_data.get('exact_points')
+
+    # Banderas y formato calculados una sola vez para toda la tabla
+    has_euler = y_eu is not None
+    has_heun = y_imp is not None
+    has_iterated = y_iter is not None
+    has_real = real_values is not None
+    # Formateadores ligados (str.format) construidos una vez: más rápidos que f-strings con
+    # especificación anidada o np.char.mod.
+    fmt_num = f"{{:.{decimals}f}}".format
+    fmt_err = f"{{:.{decimals}f}}%".format
     
     # Determinar título dinámico
     modes = []
-    if euler_points: modes.append("Euler")
-    if heun_points: modes.append("Heun")
+    if has_euler: modes.append("Euler")
+    if has_heun: modes.append("Heun")
     title = f"Resultados: {' & '.join(modes)} (h={h})"
 
-    table = Table(title=title, show_header=True, header_style="bold", title_style="bold")
-    
-    # Columnas base
-    table.add_column("Iter", justify="right", style="dim", no_wrap=True)
-    table.add_column("x_i", justify="right")
-    
-    # Base list para iterar
-    base_list = euler_points if euler_points else heun_points
-    if not base_list:
+    if x_vals is None or len(x_vals) == 0:
         show_error("No hay datos generados.")
         return
-        
-    num_steps = len(base_list)
+
+    # Una terminal no muestra de forma útil miles de filas: se toma una de cada `stride`,
+    # siempre con la última, y todas las columnas se indexan con las mismas filas.
+    n_rows = len(x_vals)
+    rows, stride = _sampled_rows(n_rows)
+    caption = None
+    if rows is not None:
+        caption = f"Se muestran {rows.size} de {n_rows} filas (una cada {stride} pasos y la última)"
+        pick = lambda a: None if a is None else np.asarray(a)[rows]
+        x_vals, y_eu, y_imp, y_iter, real_values = map(pick, (x_vals, y_eu, y_imp, y_iter, real_values))
+        errors = {key: pick(sim_data.get(key)) for key in ('euler_error', 'heun_error', 'heun_error_iterated')}
+        iters = rows.tolist()
+    else:
+        errors = {key: sim_data.get(key) for key in ('euler_error', 'heun_error', 'heun_error_iterated')}
+        iters = range(n_rows)
+
+    table = Table(title=title, caption=caption, show_header=True, header_style="bold", title_style="bold")
+
+    # Columnas base
+    table.add_column("Iter", justify="right", style="dim", no_wrap=True)
+    table.add_column("x_i", justify="right", no_wrap=True)
+    columns = [list(map(str, iters)), list(map("{:.4f}".format, x_vals.tolist()))]
 
     # Columnas condicionales
-    if real_values:
-        table.add_column("Verdadero y(x)", justify="right", style="bold")
+    if has_real:
+        real = np.asarray(real_values, dtype=float)
+        # Filas especiales del valor verdadero, una sola pasada para todas las columnas
+        nan_rows = np.flatnonzero(np.isnan(real)).tolist()
+        zero_rows = np.flatnonzero(np.abs(real) < 1e-12).tolist()
+        table.add_column("Verdadero y(x)", justify="right", style="bold", no_wrap=True)
+        columns.append(_format_values(real, fmt_num, nan_rows))
 
-    if euler_points:
-        table.add_column("Euler y_i", justify="right")
-    if heun_points:
-        table.add_column("Heun y_i", justify="right")
-    
-    # Nueva columna: Error absoluto de Heun (simple)
-    if heun_points and heun_points_iterated:
-        table.add_column("% Error", justify="right", style="yellow")
-    
-    # Nueva columna: Heun con corrector iterado
-    if heun_points_iterated:
-        table.add_column("Heun Iterado y_i", justify="right", style="cyan")
-    
-    if real_values:
-        table.add_column("% Error Iterado", justify="right", style="red")
+    # Error final: el de la aproximación iterada si hay, si no el de la simple
+    final_error = None
 
-    # Llenado de filas
-    for i in range(num_steps):
-        x_val = base_list[i][0]
-        row_data = [str(i), f"{x_val:.4f}"]
-        
-        approx_data = [] # Buffer para datos numéricos
-        y_approx_for_error = 0.0 # Para calcular error (usa la versión iterada si hay, sino la simple)
-
-        # Exacta
-        val_real = float('nan')
-        if real_values:
-            val_real = real_values[i]
-            if math.isnan(val_real):
-                row_data.append("N/A")
-            else:
-                row_data.append(f"{val_real:.{decimals}f}")
-
-        # Euler
-        if euler_points:
-            y_eu = euler_points[i][1]
-            approx_data.append(f"{y_eu:.{decimals}f}")
-            if not heun_points: y_approx_for_error = y_eu
-
-        # Heun (simple)
-        if heun_points:
-            y_imp = heun_points[i][1]
-            approx_data.append(f"{y_imp:.{decimals}f}")
-            y_approx_for_error = y_imp
-
-        # Error Porcentual de Heun simple respecto al valor verdadero
-        if heun_points and heun_points_iterated and real_values:
-            y_simple = heun_points[i][1]
-            if not math.isnan(val_real):
-                if abs(val_real) < 1e-12:
-                    approx_data.append("~0")
-                else:
-                    err = abs((val_real - y_simple) / val_real) * 100.0
-                    approx_data.append(f"{err:.{decimals}f}%")
-            else:
-                approx_data.append("N/A")
-
-        # Heun (iterado)
-        if heun_points_iterated:
-            y_iter = heun_points_iterated[i][1]
-            approx_data.append(f"{y_iter:.{decimals}f}")
-            y_approx_for_error = y_iter  # Usar la versión iterada para calcular error
-
-        row_data.extend(approx_data)
-
-        # Error Relativo
-        if real_values:
-            if not math.isnan(val_real):
-                if abs(val_real) < 1e-12:
-                    row_data.append("~0")
-                else:
-                    err = abs((val_real - y_approx_for_error) / val_real) * 100.0
-                    row_data.append(f"{err:.{decimals}f}%")
-            else:
-                row_data.append("N/A")
-        
-        table.add_row(*row_data)
+    if has_euler:
+        table.add_column("Euler y_i", justify="right", no_wrap=True)
+        columns.append(list(map(fmt_num, y_eu.tolist())))
+        final_error = errors['euler_error']
+
+    if has_heun:
+        table.add_column("Heun y_i", justify="right", no_wrap=True)
+        columns.append(list(map(fmt_num, y_imp.tolist())))
+        final_error = errors['heun_error']
+
+        # Error porcentual de Heun simple respecto al valor verdadero
+        if has_iterated and has_real:
+            table.add_column("% Error", justify="right", style="yellow", no_wrap=True)
+            columns.append(_format_errors(errors['heun_error'], fmt_err, zero_rows, nan_rows))
+
+    # Heun con corrector iterado
+    if has_iterated:
+        table.add_column("Heun Iterado y_i", justify="right", style="cyan", no_wrap=True)
+        columns.append(list(map(fmt_num, y_iter.tolist())))
+        final_error = errors['heun_error_iterated']
+
+    # Error Relativo
+    if has_real:
+        table.add_column("% Error Iterado", justify="right", style="red", no_wrap=True)
+        columns.append(_format_errors(final_error, fmt_err, zero_rows, nan_rows))
+
+    # Llenado de filas: cada fila es solo la tupla de strings ya formateados (add_row solo
+    # guarda las celdas; Rich mide los anchos una vez, al imprimir)
+    for row in zip(*columns):
+        table.add_row(*row)
         
     console.print(table)
 
+def display_batch_results(x0s: np.ndarray, y0s: np.ndarray, hs: np.ndarray, x_finals: np.ndarray,
+                          X: np.ndarray, Y: np.ndarray, n_steps: np.ndarray, decimals: int = 8):
+    """
+    Tabla resumen del barrido por lotes: una fila por trayectoria con su punto final.
+    X, Y y n_steps son los devueltos por numerical_methods.euler_method_batch.
+    Con muchas trayectorias (barrido por rango) se submuestrea como display_results.
+    """
+    import numpy as np
+    fmt_num = f"{{:.{decimals}f}}".format
+    fmt_param = "{:.10g}".format
+    n_traj = n_steps.size
+    cols = np.arange(n_traj)
+    x_last = X[n_steps, cols]
+    y_last = Y[n_steps, cols]
+
+    rows, stride = _sampled_rows(n_traj)
+    caption = None
+    if rows is not None:
+        caption = f"Se muestran {rows.size} de {n_traj} trayectorias (una cada {stride} y la última)"
+        x0s, y0s, hs, x_finals, n_steps, x_last, y_last = (
+            a[rows] for a in (x0s, y0s, hs, x_finals, n_steps, x_last, y_last))
+        cols = rows
+
+    table = Table(title=f"Barrido Euler por lotes ({n_traj} trayectorias)", caption=caption,
+                  show_header=True, header_style="bold", title_style="bold")
+    table.add_column("#", justify="right", style="dim", no_wrap=True)
+    table.add_column("x_0", justify="right", no_wrap=True)
+    table.add_column("y_0", justify="right", no_wrap=True)
+    table.add_column("h", justify="right", no_wrap=True)
+    table.add_column("x_final", justify="right", no_wrap=True)
+    table.add_column("Pasos", justify="right", no_wrap=True)
+    table.add_column("x_n", justify="right", no_wrap=True)
+    table.add_column("Euler y_n", justify="right", style="bold", no_wrap=True)
+
+    columns = [
+        list(map(str, (cols + 1).tolist())),
+        # Parámetros de entrada con hasta 10 cifras: exactos para valores tecleados y cortos
+        # para los y_0 de un barrido por rango (np.linspace)
+        list(map(fmt_param, x0s.tolist())),
+        list(map(fmt_param, y0s.tolist())),
+        list(map(fmt_param, hs.tolist())),
+        list(map(fmt_param, x_finals.tolist())),
+        list(map(str, n_steps.tolist())),
+        list(map("{:.4f}".format, x_last.tolist())),
+        _format_values(y_last, fmt_num),
+    ]
+    for row in zip(*columns):
+        table.add_row(*row)
+
+    console.print(table)
+
+def _read_choice(prompt: str) -> str:
+    """
+    Lee una opción de menú con sys.stdin.readline en lugar de input(): evita el paso por
+    PyOS_Readline en cada prompt cuando la aplicación se maneja desde un script o pipe.
+    """
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = _readline()
+    if not line:
+        # Igual que input(): fin de la entrada
+        raise EOFError
+    return line.strip()
+
 def get_main_menu_choice() -> str:
     """Muestra y captura opción del menú principal."""
-    console.print("\n[bold]Seleccione el Método Numérico:[/bold]")
-    console.print("1. Método de Euler")
-    console.print("2. Método de Euler Mejorado (Heun)")
-    console.print("3. [red]Salir[/red]")
-    return input("\nSeleccione una opción (1-3): ").strip()
+    console.print(_MAIN_MENU)
+    return _read_choice("\nSeleccione una opción (1-4): ")
 
 def get_post_calc_choice() -> str:
     """Muestra y captura menú post-cálculo."""
-    console.print("\n[bold]¿Qué desea hacer?[/bold]")
-    console.print("1. Reintentar por Euler (Misma función, nuevos parámetros)")
-    console.print("2. Reintentar por Heun (Misma función, nuevos parámetros)")
-    console.print("3. Graficar Resultados")
-    console.print("4. Graficar Errores")
-    console.print("5. Regresar al Menú Principal")
-    console.print("6. [red]Salir de la Aplicación[/red]")
-    return input("\nOpción: ").strip()
+    console.print(_POST_CALC_MENU)
+    return _read_choice("\nOpción: ")
 
 def print_separator():
     console.rule()
 
-def show_status(message: str):
+# Por debajo de este número estimado de pasos el cálculo termina antes de que el indicador
+# llegue a verse: arrancar y detener su hilo de refresco costaría más que el propio cálculo.
+_STATUS_MIN_STEPS = 10_000
+
+def show_status(message: str, est_steps: Optional[int] = None):
+    """
+    Indicador animado mientras se calcula. Sin terminal (salida redirigida o pipe) o si
+    est_steps es menor que _STATUS_MIN_STEPS se devuelve un contexto vacío: no se crea el
+    hilo de refresco ni se importa rich.status. Con est_steps=None se muestra siempre.
+    """
+    if not console.is_terminal or (est_steps is not None and est_steps < _STATUS_MIN_STEPS):
+        return contextlib.nullcontext()
     return console.status(message)
 
 def wait_for_enter():
@@ -5,15 +5,19 @@ Orquesta la interacción entre Interface, InputHandler y Simulation.
 """
 
 import sys
+import multiprocessing
 from input_handler import get_float, get_int, get_function_input
 import interface
-import simulation
-import plotting
-from rich.console import Console
-console = Console()
+from _console import console
 
 def run_solver_flow(initial_method: str):
     """Flujo de resolución de EDO: Input -> Simulación -> Resultados."""
+    # Imports perezosos: NumPy/Numba/SymPy solo se cargan si el usuario resuelve una EDO,
+    # así el menú principal aparece rápido (y salir no paga esos imports).
+    import simulation
+    from numerical_methods import compute_num_steps
+    from function_parser import exact_solution_is_cached
+
     current_method = initial_method
     
     interface.print_separator()
@@ -38,6 +42,9 @@ def run_solver_flow(initial_method: str):
             corrector_iterations = get_int("Número de iteraciones del corrector (Heun), default -> ", min_val=1, max_val=100, default=1)
         decimals = get_int("Cifras significativas, default -> ", min_val=0, max_val=20, default=8)
 
+        # Número de pasos calculado una sola vez para la simulación y el resumen
+        n_steps = compute_num_steps(t0, tf, h)
+
         console.print("")
         interface.print_separator()
 
@@ -45,8 +52,12 @@ def run_solver_flow(initial_method: str):
         interface.show_function_panel(f_str)
         
         # 4. Ejecutar Simulación
-        with interface.show_status(f"[bold]Calculando ({current_method})...[/bold]"):
-            results = simulation.run_simulation(current_method, f_func, f_str, t0, y0, h, tf, corrector_iterations)
+        # Si la solución exacta de (f, x_0, y_0) no está en caché se espera al proceso trabajador
+        # (dsolve o despejar C1, hasta segundos): ahí el indicador se muestra siempre; si ya
+        # está, solo cuando hay muchos pasos.
+        est_steps = n_steps if exact_solution_is_cached(f_str, t0, y0) else None
+        with interface.show_status(f"[bold]Calculando ({current_method})...[/bold]", est_steps):
+            results = simulation.run_simulation(current_method, f_func, f_str, t0, y0, h, tf, corrector_iterations, n_steps)
         
         # 5. Mostrar Resultados
         if results.get('exact_func_str'):
@@ -54,8 +65,11 @@ def run_solver_flow(initial_method: str):
         elif not results.get('error'):
              interface.show_info("Sin solución analítica simple (omitendo errores).")
 
+        if results.get('warning'):
+            interface.show_warning(results['warning'])
+
         interface.display_results(results, h, decimals)
-        interface.display_summary(t0, y0, tf, h, f_str)
+        interface.display_summary(t0, y0, tf, h, f_str, n_steps)
         
         interface.print_separator()
 
@@ -71,12 +85,14 @@ def run_solver_flow(initial_method: str):
                 break
             elif choice == "3":
                 try:
+                    import plotting  # matplotlib solo se carga al graficar
                     plotting.plot_results(results, f_func, t0, y0, tf, f_str)
                 except Exception as e:
                     interface.show_error(f"Error al graficar: {e}")
                 interface.wait_for_enter()
             elif choice == "4":
                 try:
+                    import plotting  # matplotlib solo se carga al graficar
                     plotting.plot_error_comparison(results, t0, f_str)
                 except Exception as e:
                     interface.show_error(f"Error al graficar errores: {e}")
@@ -89,6 +105,68 @@ def run_solver_flow(initial_method: str):
             else:
                 interface.show_error("Opción no válida.")
 
+def run_batch_flow():
+    """Barrido de parámetros: varias trayectorias (x_0, y_0, x_final, h) de la misma EDO por Euler."""
+    import numpy as np
+    from numerical_methods import MAX_BATCH_TRAJECTORIES, euler_method_batch, select_batch_backend
+
+    interface.print_separator()
+    console.print("")
+    interface.show_info("### Barrido de Parámetros (Euler por lotes) ###")
+    console.print("")
+
+    print("Ingrese la función f(x, y) para la EDO y' = f(x, y)")
+    f_func, f_str = get_function_input("f(x, y) = ")
+
+    # Por rango: x_0, x_final y h comunes e y_0 equiespaciado, sin una pregunta por trayectoria
+    # (así un barrido grande, ej. para la GPU, se ingresa con unos pocos valores).
+    mode = get_int("Barrido: 1 = rango de y_0, 2 = trayectorias una por una, default -> ",
+                   min_val=1, max_val=2, default=1)
+    if mode == 1:
+        t0 = get_float("Ingrese valor inicial x_0")
+        tf = get_float("Ingrese valor final x_final", greater_than=t0)
+        h = get_float("Ingrese tamaño de paso h", min_val=0.000001)
+        y_start = get_float("Ingrese el primer y_0 del rango")
+        y_stop = get_float("Ingrese el último y_0 del rango")
+        n_traj = get_int("Número de trayectorias", min_val=1, max_val=MAX_BATCH_TRAJECTORIES)
+        y0s = np.linspace(y_start, y_stop, n_traj)
+        x0s, x_finals, hs = (np.full(n_traj, value) for value in (t0, tf, h))
+    else:
+        n_traj = get_int("Número de trayectorias", min_val=1, max_val=MAX_BATCH_TRAJECTORIES)
+        params = []
+        for j in range(1, n_traj + 1):
+            interface.show_info(f"\nTrayectoria {j} de {n_traj}")
+            t0 = get_float("Ingrese valor inicial x_0")
+            y0 = get_float("Ingrese valor inicial y_0")
+            tf = get_float("Ingrese valor final x_final", greater_than=t0)
+            h = get_float("Ingrese tamaño de paso h", min_val=0.000001)
+            params.append((t0, y0, tf, h))
+        x0s, y0s, x_finals, hs = (np.array(col, dtype=float) for col in zip(*params))
+    decimals = get_int("Cifras significativas, default -> ", min_val=0, max_val=20, default=8)
+
+    console.print("")
+    interface.print_separator()
+    interface.show_function_panel(f_str)
+
+    # Lotes grandes con PyTorch + CUDA disponibles se ejecutan en la GPU
+    backend = select_batch_backend(n_traj)
+    if backend == 'torch':
+        interface.show_info("Usando GPU (PyTorch) para el barrido.")
+
+    # Pasos de la trayectoria más larga por número de trayectorias: trabajo aproximado del lote
+    est_steps = int(np.ceil((x_finals - x0s) / hs).max()) * n_traj
+
+    try:
+        with interface.show_status("[bold]Calculando (Euler por lotes)...[/bold]", est_steps):
+            X, Y, n_steps = euler_method_batch(f_func, x0s, y0s, hs, x_finals, backend)
+    except Exception as e:
+        interface.show_error(f"Error en simulación: {e}")
+    else:
+        interface.display_batch_results(x0s, y0s, hs, x_finals, X, Y, n_steps, decimals)
+
+    interface.print_separator()
+    interface.wait_for_enter()
+
 def main():
     """Bucle principal de la aplicación."""
     while True:
@@ -100,6 +178,8 @@ def main():
         elif choice == "2":
             run_solver_flow('HEUN')
         elif choice == "3":
+            run_batch_flow()
+        elif choice == "4":
             interface.show_info("Saliendo... ¡Hasta luego!")
             sys.exit(0)
         else:
@@ -107,6 +187,8 @@ def main():
             interface.wait_for_enter()
 
 if __name__ == "__main__":
+    # Necesario para el proceso trabajador de solve_exact_ode en el ejecutable de Windows (PyInstaller)
+    multiprocessing.freeze_support()
     try:
         main()
     except KeyboardInterrupt:
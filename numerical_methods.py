@@ -4,13 +4,220 @@ Descripción: Implementación de los algoritmos numéricos para la resolución d
 Contiene las funciones para el método de Euler y el método de Euler Mejorado (Heun).
 """
 
-from typing import Callable, List, Tuple
+import math
+import numpy as np
+from typing import Callable, Optional, Tuple, Union
+
+# Numba es opcional: si está instalado y f(x, y) viene compilada (atributo `jit` que agrega
+# parse_function), el bucle completo de integración se ejecuta como código máquina.
+try:
+    from numba import config as numba_config, njit, prange, types
+except ImportError:
+    njit = None
+
+def _compensated_add(s: float, c: float, delta: float) -> Tuple[float, float]:
+    """
+    Un paso de suma compensada de Neumaier: s + delta, acumulando en c el error de redondeo.
+    El valor corregido de la suma es s + c. En una integración larga y crece sumando
+    incrementos h * pendiente mucho menores que y; así el error de redondeo no crece con N.
+    """
+    t = s + delta
+    if math.isinf(t):
+        # Desborde (solución que diverge): la corrección daría inf - inf = nan; se conserva el inf.
+        return t, c
+    if abs(s) >= abs(delta):
+        c += (s - t) + delta
+    else:
+        c += (delta - t) + s
+    return t, c
+
+if njit is not None:
+    # f se recibe como función de primera clase con firma fija: un único kernel compilado
+    # sirve para cualquier f, por lo que puede cachearse en disco (cache=True).
+    _F_TYPE = types.FunctionType(types.float64(types.float64, types.float64))
+    _ARRAY = types.float64[::1]
+    # fastmath sin 'nnan'/'ninf' (como en function_parser), para que los inf/nan de una
+    # solución que diverge sigan llegando intactos a simulation.py, y además sin 'reassoc':
+    # reasociar las sumas anularía la compensación de _compensated_add.
+    _KERNEL_FASTMATH = {'nsz', 'arcp', 'contract', 'afn'}
+
+    _compensated_add_jit = njit(cache=True, fastmath=_KERNEL_FASTMATH)(_compensated_add)
+
+    @njit(types.UniTuple(_ARRAY, 2)(_F_TYPE, types.float64, types.float64, types.float64,
+                                    types.int64),
+          cache=True, fastmath=_KERNEL_FASTMATH)
+    def _euler_kernel(f, x0, y0, h, n):
+        """Bucle de Euler compilado: n pasos desde (x0, y0). Devuelve los arreglos (xs, ys)."""
+        # Malla x uniforme generada de una vez (como en el bucle de Python); el bucle solo integra y.
+        xs = x0 + h * np.arange(n + 1)
+        ys = np.empty(n + 1)
+        ys[0] = y0
+        s, c = y0, 0.0
+        for i in range(n):
+            s, c = _compensated_add_jit(s, c, h * f(xs[i], ys[i]))
+            ys[i + 1] = s + c
+        return xs, ys
+
+    @njit(types.UniTuple(_ARRAY, 3)(_F_TYPE, types.float64, types.float64, types.float64,
+                                    types.int64, types.int64, types.float64),
+          cache=True, fastmath=_KERNEL_FASTMATH)
+    def _heun_kernel(f, x0, y0, h, n, corrector_iterations, tol):
+        """Bucle de Heun compilado (simple e iterado). Devuelve los arreglos (xs, ys_single, ys_iter)."""
+        half_h = 0.5 * h
+        xs = x0 + h * np.arange(n + 1)
+        ys_single = np.empty(n + 1)
+        ys_single[0] = y0
+        s_single, c_single = y0, 0.0
+        if corrector_iterations == 1:
+            # Con una sola corrección ambas trayectorias coinciden: 2 evaluaciones de f por paso.
+            # La firma exige 3 arreglos; improved_euler_method descarta el tercero (devuelve None).
+            for i in range(n):
+                curr_x = xs[i]
+                x_next = xs[i + 1]
+                curr_y = ys_single[i]
+                k1 = f(curr_x, curr_y)
+                k2 = f(x_next, curr_y + h * k1)
+                s_single, c_single = _compensated_add_jit(s_single, c_single, half_h * (k1 + k2))
+                ys_single[i + 1] = s_single + c_single
+            return xs, ys_single, ys_single
+
+        ys_iter = np.empty(n + 1)
+        ys_iter[0] = y0
+        s_iter, c_iter = y0, 0.0
+        k1_reusable = False  # FSAL: el último k2 del corrector convergido sirve como próximo k1
+        k1_iter = 0.0
+        for i in range(n):
+            curr_x = xs[i]
+            x_next = xs[i + 1]
+
+            curr_y_single = ys_single[i]
+            k1_single = f(curr_x, curr_y_single)
+            k2_single = f(x_next, curr_y_single + h * k1_single)
+            s_single, c_single = _compensated_add_jit(s_single, c_single, half_h * (k1_single + k2_single))
+            ys_single[i + 1] = s_single + c_single
+
+            curr_y_iter = ys_iter[i]
+            if not k1_reusable:
+                k1_iter = f(curr_x, curr_y_iter)
+            k2_iter = f(x_next, curr_y_iter + h * k1_iter)
+            base = curr_y_iter + half_h * k1_iter
+            y_iterated = base + half_h * k2_iter
+            k1_reusable = False
+            for _ in range(corrector_iterations - 1):
+                y_prev = y_iterated
+                k2_iter = f(x_next, y_prev)
+                y_iterated = base + half_h * k2_iter
+                if abs(y_iterated - y_prev) < tol:
+                    k1_reusable = True
+                    break
+
+            # El iterado solo sirve para hallar k2; el nuevo y se acumula con compensación
+            s_iter, c_iter = _compensated_add_jit(s_iter, c_iter, half_h * (k1_iter + k2_iter))
+            ys_iter[i + 1] = s_iter + c_iter
+            k1_iter = k2_iter
+        return xs, ys_single, ys_iter
+
+    _INT_ARRAY = types.int64[::1]
+    _BATCH_SIGNATURE = types.UniTuple(types.float64[:, ::1], 2)(
+        _F_TYPE, _ARRAY, _ARRAY, _ARRAY, _INT_ARRAY, types.int64)
+
+    def _euler_batch_loop(f, x0_arr, y0_arr, h_arr, n_steps, n_max):
+        """
+        Euler por lotes (se compila en _get_euler_batch_kernel): cada trayectoria es un bucle
+        escalar independiente y las trayectorias se reparten entre los hilos con prange. Las
+        filas posteriores a n_steps[j] repiten el último punto, igual que la máscara de
+        euler_method_batch.
+        """
+        m = x0_arr.size
+        X = np.empty((n_max + 1, m))
+        Y = np.empty((n_max + 1, m))
+        for j in prange(m):
+            x0 = x0_arr[j]
+            h = h_arr[j]
+            n = n_steps[j]
+            x = x0
+            y = y0_arr[j]
+            X[0, j] = x
+            Y[0, j] = y
+            for i in range(n):
+                y = y + h * f(x, y)
+                x = x0 + (i + 1) * h
+                X[i + 1, j] = x
+                Y[i + 1, j] = y
+            for i in range(n + 1, n_max + 1):
+                X[i, j] = x
+                Y[i, j] = y
+        return X, Y
+else:
+    _euler_kernel = None
+    _heun_kernel = None
+
+# Kernel paralelo de Euler por lotes, compilado en el primer barrido que lo usa (ver abajo).
+_euler_batch_kernel = None
+
+def _get_euler_batch_kernel():
+    """
+    Compila (o carga del caché en disco) el kernel paralelo la primera vez y lo guarda en
+    _euler_batch_kernel. No se compila al importar: un kernel con parallel=True arranca el
+    pool de hilos de Numba (TBB) al cargarse, y el resto de la aplicación, que nunca hace
+    barridos, no debe pagar ese pool ni heredarlo en un fork.
+    """
+    global _euler_batch_kernel
+    if _euler_batch_kernel is None and njit is not None:
+        _euler_batch_kernel = njit(_BATCH_SIGNATURE, cache=True, fastmath=_KERNEL_FASTMATH,
+                                   parallel=True)(_euler_batch_loop)
+    return _euler_batch_kernel
+
+# Extensión de Cython opcional (_ode_kernels.pyx, compilar con `cythonize -i _ode_kernels.pyx`).
+# Se usa cuando no hay Numba o f no pudo compilarse: f sigue siendo Python pero el bucle es C.
+try:
+    from _ode_kernels import euler_kernel as _cy_euler_kernel, heun_kernel as _cy_heun_kernel
+except ImportError:
+    _cy_euler_kernel = None
+    _cy_heun_kernel = None
+
+
+def _step_tolerance(x0: Union[float, np.ndarray], x_end: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    """
+    Margen para que x_end - x0 que debería ser un múltiplo exacto de h no agregue un paso de más
+    por redondeo: 1e-9 absoluto más unos ulp de la mayor magnitud de x (con x grandes, ej. 1e8,
+    el error de representación de x0 y x_end supera a 1e-9). Acepta escalares o arreglos.
+    """
+    return 1e-9 + 8 * np.finfo(float).eps * np.maximum(abs(x0), abs(x_end))
+
+def compute_num_steps(x0: float, x_end: float, h: float) -> int:
+    """
+    Número de pasos (entero, fijo antes del bucle) que dan los métodos para ir de x0 hasta
+    x_end con paso h. Se redondea hacia arriba, con el margen de _step_tolerance para errores
+    de redondeo, así que el último x = x0 + n*h puede superar a x_end en menos de h, igual que
+    la antigua condición de parada `curr_x < x_end - 1e-9`.
+    """
+    return max(0, math.ceil((x_end - x0 - float(_step_tolerance(x0, x_end))) / h))
+
+def _as_output_dtype(dtype: np.dtype, *arrays: Optional[np.ndarray]) -> Tuple[Optional[np.ndarray], ...]:
+    """
+    Convierte los arreglos de salida (calculados en float64) a `dtype`, sin copiar si ya lo son.
+    Los None (ys_iter sin corrector iterado) se conservan.
+    """
+    if np.dtype(dtype) == np.float64:
+        return arrays
+    return tuple(None if a is None else a.astype(dtype) for a in arrays)
+
+def relative_error_percent(real: np.ndarray, approx: np.ndarray) -> np.ndarray:
+    """
+    Error relativo porcentual |(real - approx) / real| * 100 de toda una serie, en una pasada.
+    nan donde no hay valor verdadero; inf donde el valor verdadero es cero.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.abs((real - approx) / real) * 100.0
 
 def euler_method(f: Callable[[float, float], float], 
                  x0: float, 
                  y0: float, 
                  h: float, 
-                 x_end: float) -> List[Tuple[float, float]]:
+                 x_end: float,
+                 n_steps: Optional[int] = None,
+                 dtype: np.dtype = np.float64) -> Tuple[np.ndarray, np.ndarray]:
     """
     Resuelve una EDO y' = f(x, y) utilizando el método de Euler.
 
@@ -22,12 +229,15 @@ def euler_method(f: Callable[[float, float], float],
         y0 (float): Valor inicial de y (condición inicial).
         h (float): Tamaño del paso (debe ser > 0).
         x_end (float): Valor final de x hasta donde integrar (debe ser > x0).
+        n_steps (Optional[int]): Número de pasos ya calculado con compute_num_steps (opcional).
+        dtype (np.dtype): Tipo de los arreglos devueltos. La integración siempre se hace en
+                          float64; np.float32 reduce a la mitad la memoria del resultado.
 
     Raises:
         ValueError: Si los parámetros son inválidos.
 
     Returns:
-        List[Tuple[float, float]]: Lista de tuplas (x_i, y_i) con los resultados.
+        Tuple[np.ndarray, np.ndarray]: Arreglos (xs, ys) con los valores x_i e y_i, en `dtype`.
     """
     # Validación de parámetros
     if h <= 0:
@@ -35,21 +245,52 @@ def euler_method(f: Callable[[float, float], float],
     if x_end <= x0:
         raise ValueError(f"x_end ({x_end}) debe ser mayor que x0 ({x0})")
     
-    points = [(x0, y0)]
-    curr_x = x0
+    # Número de pasos fijo antes del bucle (sin comparar x con x_end en cada iteración);
+    # x_i se deriva del índice, x0 + i*h, para no acumular error de redondeo en x.
+    if n_steps is None:
+        n_steps = compute_num_steps(x0, x_end, h)
+
+    # Camino compilado: f y el bucle completo en Numba, sin pasar por el intérprete en cada paso.
+    f_jit = getattr(f, 'jit', None)
+    if f_jit is not None and _euler_kernel is not None:
+        return _as_output_dtype(dtype, *_euler_kernel(f_jit, x0, y0, h, n_steps))
+
+    # Sin Numba: bucle de Cython si la extensión está compilada
+    if _cy_euler_kernel is not None:
+        xs = np.empty(n_steps + 1)
+        ys = np.empty(n_steps + 1)
+        _cy_euler_kernel(f, x0, y0, h, n_steps, xs, ys)
+        return _as_output_dtype(dtype, xs, ys)
+
+    # La malla x es uniforme y no depende de y: se genera completa de una vez con la misma
+    # fórmula x0 + i*h que los kernels (los de Numba compilan con 'contract' y LLVM puede
+    # fusionarla en una FMA, así que con x0 != 0 un x puede diferir en 1 ulp). ys se preasigna
+    # con el número de pasos exacto; el bucle solo evalúa f, con x como float de Python
+    # (tolist) y el y actual como local.
+    xs = x0 + h * np.arange(n_steps + 1)
+    ys = np.empty(n_steps + 1)
+    ys[0] = y0
     curr_y = y0
+    s, c = y0, 0.0  # y con suma compensada (ver _compensated_add)
+    # Invariantes del bucle como locales: en CPython cada acceso global/atributo es una búsqueda
+    isinf = math.isinf
 
-    # Iterar mientras no superemos x_end.
-    # Usamos un pequeño epsilon para manejo de errores de punto flotante en la parada.
-    # O simplemente número de pasos calculados si quisiéramos ser más exactos con steps enteros.
-    # Aquí iremos acumulando x.
-    while curr_x < x_end - 1e-9: # 1e-9 evita un último paso extra por error de redondeo
+    for i, curr_x in enumerate(xs[:-1].tolist()):
         slope = f(curr_x, curr_y)
-        curr_y = curr_y + h * slope
-        curr_x = curr_x + h
-        points.append((curr_x, curr_y))
+        # _compensated_add escrita en línea: en Python la llamada por paso cuesta más que la suma
+        delta = h * slope
+        t = s + delta
+        if isinf(t):
+            pass  # desborde: se conserva el inf (ver _compensated_add)
+        elif abs(s) >= abs(delta):
+            c += (s - t) + delta
+        else:
+            c += (delta - t) + s
+        s = t
+        curr_y = s + c
+        ys[i + 1] = curr_y
     
-    return points
+    return _as_output_dtype(dtype, xs, ys)
 
 
 def improved_euler_method(f: Callable[[float, float], float], 
@@ -57,7 +298,10 @@ def improved_euler_method(f: Callable[[float, float], float],
                           y0: float, 
                           h: float, 
                           x_end: float,
-                          corrector_iterations: int = 1) -> List[Tuple[float, float, float]]:
+                          corrector_iterations: int = 1,
+                          n_steps: Optional[int] = None,
+                          tol: float = 1e-12,
+                          dtype: np.dtype = np.float64) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
     """
     Resuelve una EDO y' = f(x, y) utilizando el método de Euler Mejorado (Método de Heun).
     Es un método Predictor-Corrector con corrector iterado.
@@ -72,15 +316,22 @@ def improved_euler_method(f: Callable[[float, float], float],
         y0 (float): Valor inicial de y (condición inicial).
         h (float): Tamaño del paso (debe ser > 0).
         x_end (float): Valor final de x (debe ser > x0).
-        corrector_iterations (int): Número de iteraciones del corrector (default 1, debe ser >= 1).
+        corrector_iterations (int): Número máximo de iteraciones del corrector (default 1, debe ser >= 1).
+        n_steps (Optional[int]): Número de pasos ya calculado con compute_num_steps (opcional).
+        tol (float): El corrector se detiene antes de corrector_iterations si dos iterados
+                     consecutivos difieren en menos de tol (default 1e-12). En ese caso su
+                     última evaluación de f se reutiliza como k1 del paso siguiente (FSAL).
+        dtype (np.dtype): Tipo de los arreglos devueltos (ver euler_method).
 
     Raises:
         ValueError: Si los parámetros son inválidos.
 
     Returns:
-        List[Tuple[float, float, float]]: Lista de tuplas (x_i, y_i_single, y_i_iterated) con los resultados.
-                                          y_i_single: resultado con 1 corrección
-                                          y_i_iterated: resultado con iteraciones completas
+        Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]: Arreglos (xs, ys_single, ys_iter), en `dtype`.
+                                                   ys_single: resultado con 1 corrección
+                                                   ys_iter: resultado con iteraciones completas;
+                                                   None si corrector_iterations == 1 (coincidiría
+                                                   con ys_single)
     """
     # Validación de parámetros
     if h <= 0:
@@ -90,45 +341,253 @@ def improved_euler_method(f: Callable[[float, float], float],
     if corrector_iterations < 1:
         raise ValueError(f"El número de iteraciones del corrector debe ser >= 1, se recibió: {corrector_iterations}")
     
-    points = [(x0, y0, y0)]  # Punto inicial: iteración 0
-    curr_x = x0
+    # Pasos fijos y x derivado del índice (ver euler_method)
+    if n_steps is None:
+        n_steps = compute_num_steps(x0, x_end, h)
+
+    # Camino compilado (ver euler_method)
+    f_jit = getattr(f, 'jit', None)
+    # Con una sola corrección la trayectoria iterada es idéntica a la simple: no se
+    # recalcula (2 evaluaciones de f por paso en lugar de 4) ni se asigna su arreglo.
+    track_iter = corrector_iterations > 1
+
+    if f_jit is not None and _heun_kernel is not None:
+        xs, ys_single, ys_iter = _heun_kernel(f_jit, x0, y0, h, n_steps, corrector_iterations, tol)
+        return _as_output_dtype(dtype, xs, ys_single, ys_iter if track_iter else None)
+
+    # Sin Numba: bucle de Cython si la extensión está compilada
+    if _cy_heun_kernel is not None:
+        xs = np.empty(n_steps + 1)
+        ys_single = np.empty(n_steps + 1)
+        # Sin corrector iterado el kernel no escribe ys_iter: se le pasa ys_single como relleno
+        ys_iter = np.empty(n_steps + 1) if track_iter else ys_single
+        _cy_heun_kernel(f, x0, y0, h, n_steps, corrector_iterations, tol, xs, ys_single, ys_iter)
+        return _as_output_dtype(dtype, xs, ys_single, ys_iter if track_iter else None)
+
+    half_h = 0.5 * h
+
+    # Malla x completa y arreglos y preasignados (ver euler_method). Punto inicial: iteración 0
+    xs = x0 + h * np.arange(n_steps + 1)
+    x_list = xs.tolist()
+    ys_single = np.empty(n_steps + 1)
+    ys_iter = None
+    ys_single[0] = y0
+    if track_iter:
+        ys_iter = np.empty(n_steps + 1)
+        ys_iter[0] = y0
     curr_y_single = y0  # Para seguimiento de Heun simple
     curr_y_iter = y0    # Para seguimiento de Heun iterado
+    # Cada trayectoria acumula y con suma compensada (ver _compensated_add)
+    s_single, c_single = y0, 0.0
+    s_iter, c_iter = y0, 0.0
+    # FSAL en la trayectoria iterada: si el corrector convergió, su último k2 = f(x_{i+1}, y^(k-1))
+    # difiere de f(x_{i+1}, y_{i+1}) en menos de L*tol (L: constante de Lipschitz de f), así
+    # que se reutiliza como k1 del paso siguiente y se ahorra una evaluación de f por paso.
+    k1_reusable = False
+    k1_iter = None
+    # Invariantes del bucle como locales (ver euler_method)
+    compensated_add = _compensated_add
+
+    for i in range(n_steps):
+        curr_x = x_list[i]
+        x_next = x_list[i + 1]
 
-    while curr_x < x_end - 1e-9:
         # Paso 1: Calcular la pendiente en el punto actual para versión simple
         # k1 = f(x_i, y_i)
         k1_single = f(curr_x, curr_y_single)
         
         # Paso 2: Predecir el siguiente punto usando Euler simple
-        x_next = curr_x + h
         y_predict_single = curr_y_single + h * k1_single
         
         # Paso 3: Calcular la pendiente en el punto predicho
         k2_single = f(x_next, y_predict_single)
         
         # Paso 4: Corrección simple (una iteración)
-        y_single_correction = curr_y_single + (h / 2.0) * (k1_single + k2_single)
-        
-        # Ahora para la versión iterada, usar su propia trayectoria
-        k1_iter = f(curr_x, curr_y_iter)
-        y_predict_iter = curr_y_iter + h * k1_iter
-        k2_iter = f(x_next, y_predict_iter)
-        
-        # Corrección simple (una iteración) para versión iterada
-        y_iterated = curr_y_iter + (h / 2.0) * (k1_iter + k2_iter)
+        s_single, c_single = compensated_add(s_single, c_single, half_h * (k1_single + k2_single))
+        y_single_correction = s_single + c_single
         
-        # Paso 5: Correcciones iteradas si corrector_iterations > 1
-        if corrector_iterations > 1:
+        # Paso 5: Trayectoria iterada (solo si corrector_iterations > 1), con sus propios k1/k2
+        if track_iter:
+            if not k1_reusable:
+                k1_iter = f(curr_x, curr_y_iter)
+            y_predict_iter = curr_y_iter + h * k1_iter
+            k2_iter = f(x_next, y_predict_iter)
+            # y_i + (h/2) * f(x_i, y_i) no cambia entre iteraciones del corrector
+            base = curr_y_iter + half_h * k1_iter
+            y_iterated = base + half_h * k2_iter
+            k1_reusable = False
             for _ in range(corrector_iterations - 1):
                 # y_{i+1}^(k) = y_i + (h/2) * [ f(x_i, y_i) + f(x_{i+1}, y_{i+1}^(k-1)) ]
-                k2_iter_new = f(x_next, y_iterated)
-                y_iterated = curr_y_iter + (h / 2.0) * (k1_iter + k2_iter_new)
+                y_prev = y_iterated
+                k2_iter = f(x_next, y_prev)
+                y_iterated = base + half_h * k2_iter
+                # Punto fijo alcanzado: más iteraciones no cambian el resultado
+                if abs(y_iterated - y_prev) < tol:
+                    k1_reusable = True
+                    break
+            # El iterado solo sirve para hallar k2; el nuevo y se acumula con compensación
+            s_iter, c_iter = compensated_add(s_iter, c_iter, half_h * (k1_iter + k2_iter))
+            curr_y_iter = s_iter + c_iter         # Seguir con versión iterada para próximo paso
+            ys_iter[i + 1] = curr_y_iter
+            k1_iter = k2_iter
         
-        # Actualizar x y guardar tanto la versión simple como la iterada
-        curr_x = x_next
+        # Guardar la versión simple
         curr_y_single = y_single_correction  # Seguir con versión simple para próximo paso
-        curr_y_iter = y_iterated              # Seguir con versión iterada para próximo paso
-        points.append((curr_x, y_single_correction, y_iterated))
+        ys_single[i + 1] = y_single_correction
         
-    return points
+    return _as_output_dtype(dtype, xs, ys_single, ys_iter)
+
+
+# Con menos trayectorias el costo de lanzar kernels en la GPU supera la ganancia.
+_TORCH_MIN_BATCH = 1024
+
+# Máximo de trayectorias que acepta el barrido interactivo (main.run_batch_flow). Se deriva
+# del umbral de la GPU para que el backend 'torch' siempre pueda alcanzarse desde la interfaz.
+MAX_BATCH_TRAJECTORIES = 4 * _TORCH_MIN_BATCH
+
+def select_batch_backend(n_trajectories: int) -> str:
+    """
+    Backend para euler_method_batch: 'torch' (GPU) si PyTorch está instalado, hay CUDA y el
+    lote es grande (>= _TORCH_MIN_BATCH, 1024 trayectorias); en cualquier otro caso 'numpy'.
+    """
+    if n_trajectories < _TORCH_MIN_BATCH:
+        return 'numpy'
+    try:
+        import torch
+    except ImportError:
+        return 'numpy'
+    return 'torch' if torch.cuda.is_available() else 'numpy'
+
+def _euler_batch_torch(f: Callable, x0_arr: np.ndarray, y0_arr: np.ndarray, h_arr: np.ndarray,
+                       n_steps: np.ndarray, n_max: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Mismo bucle en bloque que euler_method_batch, con tensores de PyTorch en la GPU (o CPU sin CUDA)."""
+    import torch
+    import sympy as sp
+
+    expr = getattr(f, 'expr', None)
+    if expr is None:
+        raise ValueError("El backend 'torch' necesita una función creada con parse_function")
+    f_torch = sp.lambdify(sp.symbols('x y'), expr, modules=[torch])
+
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    as_tensor = lambda a: torch.as_tensor(a, dtype=torch.float64, device=device)
+    x0_t, y0_t, h_t = as_tensor(x0_arr), as_tensor(y0_arr), as_tensor(h_arr)
+    n_t = torch.as_tensor(n_steps, device=device)
+
+    X = torch.empty((n_max + 1, x0_t.numel()), dtype=torch.float64, device=device)
+    Y = torch.empty_like(X)
+    X[0] = x0_t
+    Y[0] = y0_t
+    for i in range(n_max):
+        active = i < n_t
+        slope = f_torch(X[i], Y[i])
+        Y[i + 1] = torch.where(active, Y[i] + h_t * slope, Y[i])
+        X[i + 1] = torch.where(active, x0_t + (i + 1) * h_t, X[i])
+
+    return X.cpu().numpy(), Y.cpu().numpy()
+
+def _euler_batch_common_grid(f_vec: Callable, x0: float, y0_arr: np.ndarray, h: float,
+                             n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    euler_method_batch cuando todas las trayectorias usan la misma malla x: no hace falta la
+    máscara `active` y x es un escalar por paso, así cada paso es una sola operación
+    vectorial Y[i + 1] = Y[i] + h * f(x_i, Y[i]) sobre las B trayectorias.
+    X se materializa al final como arreglo propio (n + 1, B), escribible y contiguo como en
+    los demás caminos de euler_method_batch.
+    """
+    xs = x0 + h * np.arange(n + 1)
+    Y = np.empty((n + 1, y0_arr.size))
+    Y[0] = y0_arr
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        for i, x in enumerate(xs[:-1].tolist()):
+            Y[i + 1] = Y[i] + h * f_vec(x, Y[i])
+    return np.repeat(xs[:, None], y0_arr.size, axis=1), Y
+
+def euler_method_batch(f: Callable,
+                       x0_arr: np.ndarray,
+                       y0_arr: np.ndarray,
+                       h_arr: np.ndarray,
+                       x_end_arr: np.ndarray,
+                       backend: str = 'numpy') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Resuelve B trayectorias de y' = f(x, y) con el método de Euler, todas a la vez.
+
+    Cada paso evalúa f una sola vez sobre los B valores (operaciones vectoriales de NumPy)
+    en lugar de B bucles escalares. Una trayectoria que ya llegó a su x_end queda congelada
+    mediante la máscara `active`, así las que terminan más tarde no alteran su resultado.
+    Si todas comparten x0, h y número de pasos (barrido de y0) se usa una malla x común,
+    sin máscara.
+
+    Args:
+        f (Callable): La función derivada f(x, y). Se usa su versión vectorizada `f.vec`
+                      (la agrega parse_function); si no existe se envuelve con np.vectorize.
+        x0_arr, y0_arr, h_arr, x_end_arr (np.ndarray): Parámetros de cada trayectoria (longitud B).
+        backend (str): 'numpy' (por defecto) o 'torch' para ejecutar el bucle con PyTorch en la
+                       GPU (requiere torch; ver select_batch_backend). Con 'numpy', si Numba está
+                       disponible con más de un hilo y f viene compilada (`f.jit`), las
+                       trayectorias se integran en paralelo con un kernel de Numba (prange)
+                       en lugar del bucle en bloque.
+
+    Raises:
+        ValueError: Si los parámetros son inválidos.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (X, Y, n_steps). X e Y tienen forma
+        (max(n_steps) + 1, B), son arreglos propios (escribibles y contiguos) con cualquier
+        backend; la trayectoria j es válida en las filas 0..n_steps[j].
+    """
+    x0_arr, y0_arr, h_arr, x_end_arr = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float).ravel() for a in (x0_arr, y0_arr, h_arr, x_end_arr)))
+    if np.any(h_arr <= 0):
+        raise ValueError("Todos los tamaños de paso h deben ser positivos")
+    if np.any(x_end_arr <= x0_arr):
+        raise ValueError("Cada x_end debe ser mayor que su x0")
+
+    # Mismo criterio de pasos que compute_num_steps, por trayectoria
+    tol = _step_tolerance(x0_arr, x_end_arr)
+    n_steps = np.maximum(0, np.ceil((x_end_arr - x0_arr - tol) / h_arr)).astype(np.int64)
+    n_max = int(n_steps.max()) if n_steps.size else 0
+
+    if backend == 'torch':
+        X, Y = _euler_batch_torch(f, x0_arr, y0_arr, h_arr, n_steps, n_max)
+        return X, Y, n_steps
+    if backend != 'numpy':
+        raise ValueError(f"Backend desconocido: {backend}")
+
+    # Con Numba, f compilada y varios hilos: un bucle escalar por trayectoria, en paralelo
+    # entre núcleos (sin temporales de NumPy por paso). Con un solo hilo el bucle en bloque de
+    # NumPy, que evalúa f vectorizada, resulta igual o más rápido, así que se conserva.
+    # Se consulta NUMBA_NUM_THREADS y no get_num_threads(), que arrancaría el pool de hilos.
+    f_jit = getattr(f, 'jit', None)
+    if f_jit is not None and njit is not None and numba_config.NUMBA_NUM_THREADS > 1:
+        # broadcast_arrays puede devolver vistas con paso 0: el kernel exige arreglos contiguos
+        x0_c, y0_c, h_c = (np.ascontiguousarray(a) for a in (x0_arr, y0_arr, h_arr))
+        X, Y = _get_euler_batch_kernel()(f_jit, x0_c, y0_c, h_c, n_steps, n_max)
+        return X, Y, n_steps
+
+    f_vec = getattr(f, 'vec', None)
+    if f_vec is None:
+        f_vec = np.vectorize(f, otypes=[float])
+
+    # Barrido de condiciones iniciales: todas las trayectorias comparten x0, h y número de pasos
+    if x0_arr.size and (x0_arr == x0_arr[0]).all() and (h_arr == h_arr[0]).all() \
+            and (n_steps == n_max).all():
+        X, Y = _euler_batch_common_grid(f_vec, x0_arr[0], y0_arr, h_arr[0], n_max)
+        return X, Y, n_steps
+
+    X = np.empty((n_max + 1, x0_arr.size))
+    Y = np.empty((n_max + 1, x0_arr.size))
+    X[0] = x0_arr
+    Y[0] = y0_arr
+
+    # Las trayectorias congeladas siguen evaluándose (paso en bloque); sus inf/nan se descartan.
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        for i in range(n_max):
+            active = i < n_steps
+            slope = f_vec(X[i], Y[i])
+            # Trayectorias terminadas: se repite su último punto
+            Y[i + 1] = np.where(active, Y[i] + h_arr * slope, Y[i])
+            # x desde el índice del paso (sin acumular X[i] + h)
+            X[i + 1] = np.where(active, x0_arr + (i + 1) * h_arr, X[i])
+
+    return X, Y, n_steps
@@ -4,12 +4,50 @@ Descripción: Visualización de resultados numéricos mediante gráficos.
 Genera gráficas comparativas de métodos numéricos vs solución exacta.
 """
 
-import matplotlib.pyplot as plt
+import os
+import sys
 import numpy as np
 from typing import Callable, List, Tuple, Optional, Dict, Any
-from rich.console import Console
+from _console import console
 
-console = Console()
+# matplotlib.pyplot se importa en el primer gráfico (ver _get_pyplot), no al importar el módulo.
+_plt = None
+
+# Puntos de la curva exacta: con mallas del método de al menos este tamaño se reutiliza su xs
+_DENSE_POINTS = 500
+
+
+def _get_pyplot():
+    """
+    Importa matplotlib.pyplot una sola vez y lo guarda en _plt. En Linux sin DISPLAY ni
+    WAYLAND_DISPLAY (ej. por SSH) se fija el backend 'Agg' antes del import, para no probar
+    backends gráficos que no pueden abrir una ventana. MPLBACKEND, si está definido, manda.
+    """
+    global _plt
+    if _plt is None:
+        import matplotlib
+        headless = (sys.platform.startswith('linux')
+                    and not os.environ.get('DISPLAY')
+                    and not os.environ.get('WAYLAND_DISPLAY'))
+        if headless and 'MPLBACKEND' not in os.environ:
+            matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        _plt = plt
+    return _plt
+
+
+def _show_figure(plt, fig) -> None:
+    """Muestra la figura; con un backend sin ventana (Agg) avisa en lugar de llamar a show()."""
+    if plt.get_backend().lower() == 'agg':
+        plt.close(fig)
+        console.print("[bold red]Error al mostrar gráfica:[/bold red] no hay una pantalla disponible")
+        console.print("[dim]Intenta ejecutar desde un entorno con soporte gráfico[/dim]")
+        return
+    try:
+        plt.show()
+    except Exception as e:
+        console.print(f"[bold red]Error al mostrar gráfica:[/bold red] {e}")
+        console.print("[dim]Intenta ejecutar desde un entorno con soporte gráfico[/dim]")
 
 
 def plot_results(sim_data: Dict[str, Any], 
@@ -22,57 +60,61 @@ def plot_results(sim_data: Dict[str, Any],
     Genera un gráfico comparativo de los resultados numéricos.
     
     Args:
-        sim_data: Diccionario con resultados de la simulación
+        sim_data: Diccionario con resultados de la simulación. La curva exacta densa se
+                  guarda en sim_data['exact_curve_xy'] ({n_puntos: (x, y)}) para reutilizarla.
         func: Función f(x, y) de la EDO
         x0: Valor inicial de x
         y0: Valor inicial de y
         x_end: Valor final de x
         func_str: String representando la función EDO
     """
-    euler_points = sim_data.get('euler_points')
-    heun_points = sim_data.get('heun_points')
-    heun_points_iterated = sim_data.get('heun_points_iterated')
+    x_vals = sim_data.get('x_values')
+    y_euler = sim_data.get('euler_values')
+    y_heun = sim_data.get('heun_values')
+    y_heun_iter = sim_data.get('heun_values_iterated')
     exact_points = sim_data.get('exact_points')
     exact_func_str = sim_data.get('exact_func_str')
+    real_func = sim_data.get('exact_func')
     
     # Verificar que hay datos para graficar
-    if not euler_points and not heun_points:
+    if y_euler is None and y_heun is None:
         console.print("[bold red]Error:[/bold red] No hay datos para graficar")
         return
     
     # Crear figura
+    plt = _get_pyplot()
     fig, ax = plt.subplots(figsize=(12, 7))
     
-    # Obtener puntos base para x
-    base_points = euler_points if euler_points else heun_points
-    x_vals = [p[0] for p in base_points]
-    
     # Graficar Euler si existe
-    if euler_points:
-        y_euler = [p[1] for p in euler_points]
+    if y_euler is not None:
         ax.plot(x_vals, y_euler, 'o-', label='Euler', linewidth=2, markersize=5, alpha=0.7)
     
     # Graficar Heun si existe
-    if heun_points:
-        y_heun = [p[1] for p in heun_points]
+    if y_heun is not None:
         ax.plot(x_vals, y_heun, 's-', label='Heun (1 iteración)', linewidth=2, markersize=5, alpha=0.7)
     
     # Graficar Heun iterado si existe
-    if heun_points_iterated:
-        y_heun_iter = [p[1] for p in heun_points_iterated]
+    if y_heun_iter is not None:
         ax.plot(x_vals, y_heun_iter, '^-', label='Heun Iterado', linewidth=2, markersize=5, alpha=0.7)
     
     # Graficar solución exacta si existe
-    if exact_points and exact_func_str:
-        # Crear array denso de puntos x para gráfica suave de la exacta
-        x_dense = np.linspace(x0, x_end, 500)
+    # (la función ya la obtuvo run_simulation: no se vuelve a resolver la EDO)
+    if exact_points is not None and exact_func_str and real_func is not None:
         try:
-            from function_parser import solve_exact_ode
-            exact_res = solve_exact_ode(func_str, x0, y0)
-            if exact_res:
-                real_func, _ = exact_res
-                y_exact = [real_func(x) for x in x_dense]
-                ax.plot(x_dense, y_exact, 'r-', label=f'Exacta: {exact_func_str}', linewidth=2.5, alpha=0.8)
+            if len(x_vals) >= _DENSE_POINTS:
+                # La malla del método ya es suficientemente densa: se reutilizan xs y los
+                # valores exactos que calculó run_simulation (sin evaluar nada más)
+                x_dense, y_exact = x_vals, exact_points
+            else:
+                # Malla más fina para una curva suave: hasta 4 puntos por paso, máximo 500.
+                # Se guarda en sim_data por densidad: al volver a graficar no se reevalúa.
+                n_dense = max(len(x_vals), min(_DENSE_POINTS, 4 * len(x_vals)))
+                curve_cache = sim_data.setdefault('exact_curve_xy', {})
+                if n_dense not in curve_cache:
+                    x_grid = np.linspace(x0, x_end, n_dense)
+                    curve_cache[n_dense] = (x_grid, real_func(x_grid))
+                x_dense, y_exact = curve_cache[n_dense]
+            ax.plot(x_dense, y_exact, 'r-', label=f'Exacta: {exact_func_str}', linewidth=2.5, alpha=0.8)
         except Exception as e:
             console.print(f"[dim]Nota: No se pudo graficar solución exacta ({e})[/dim]")
     
@@ -87,11 +129,16 @@ def plot_results(sim_data: Dict[str, Any],
     plt.tight_layout()
     
     # Mostrar gráfica
-    try:
-        plt.show()
-    except Exception as e:
-        console.print(f"[bold red]Error al mostrar gráfica:[/bold red] {e}")
-        console.print("[dim]Intenta ejecutar desde un entorno con soporte gráfico[/dim]")
+    _show_figure(plt, fig)
+
+
+def _finite_or_nan(err: np.ndarray) -> np.ndarray:
+    """
+    Error relativo listo para semilogy: inf (valor verdadero cero) y nan (sin valor verdadero)
+    quedan como nan, que matplotlib deja como hueco en la curva.
+    """
+    err = np.asarray(err, dtype=float)
+    return np.where(np.isfinite(err), err, np.nan)
 
 
 def plot_error_comparison(sim_data: Dict[str, Any],
@@ -106,58 +153,34 @@ def plot_error_comparison(sim_data: Dict[str, Any],
         x0: Valor inicial de x
         func_str: String representando la función EDO
     """
-    euler_points = sim_data.get('euler_points')
-    heun_points = sim_data.get('heun_points')
-    heun_points_iterated = sim_data.get('heun_points_iterated')
+    x_vals = sim_data.get('x_values')
+    euler_error = sim_data.get('euler_error')
+    heun_error = sim_data.get('heun_error')
+    heun_error_iter = sim_data.get('heun_error_iterated')
     exact_points = sim_data.get('exact_points')
     
     # Verificar que hay datos y solución exacta
-    if not exact_points:
+    if exact_points is None:
         console.print("[dim]No se puede graficar errores: solución exacta no disponible[/dim]")
         return
     
-    base_points = euler_points if euler_points else heun_points
-    if not base_points:
+    if x_vals is None:
         return
     
-    x_vals = [p[0] for p in base_points]
-    
     # Crear figura
+    plt = _get_pyplot()
     fig, ax = plt.subplots(figsize=(12, 7))
     
-    # Calcular errores relativos porcentuales
-    if euler_points:
-        errors_euler = []
-        for i, (x, y_euler) in enumerate(euler_points):
-            y_exact = exact_points[i]
-            if abs(y_exact) > 1e-12:
-                err = abs((y_exact - y_euler) / y_exact) * 100.0
-                errors_euler.append(err)
-            else:
-                errors_euler.append(0)
-        ax.semilogy(x_vals, errors_euler, 'o-', label='Error Euler', linewidth=2, markersize=5)
-    
-    if heun_points:
-        errors_heun = []
-        for i, (x, y_heun) in enumerate(heun_points):
-            y_exact = exact_points[i]
-            if abs(y_exact) > 1e-12:
-                err = abs((y_exact - y_heun) / y_exact) * 100.0
-                errors_heun.append(err)
-            else:
-                errors_heun.append(0)
-        ax.semilogy(x_vals, errors_heun, 's-', label='Error Heun', linewidth=2, markersize=5)
-    
-    if heun_points_iterated:
-        errors_heun_iter = []
-        for i, (x, y_iter) in enumerate(heun_points_iterated):
-            y_exact = exact_points[i]
-            if abs(y_exact) > 1e-12:
-                err = abs((y_exact - y_iter) / y_exact) * 100.0
-                errors_heun_iter.append(err)
-            else:
-                errors_heun_iter.append(0)
-        ax.semilogy(x_vals, errors_heun_iter, '^-', label='Error Heun Iterado', linewidth=2, markersize=5)
+    # Errores relativos porcentuales ya calculados por run_simulation (relative_error_percent):
+    # aquí solo se ocultan los valores no finitos, sin una segunda fórmula del error.
+    if euler_error is not None:
+        ax.semilogy(x_vals, _finite_or_nan(euler_error), 'o-', label='Error Euler', linewidth=2, markersize=5)
+    
+    if heun_error is not None:
+        ax.semilogy(x_vals, _finite_or_nan(heun_error), 's-', label='Error Heun', linewidth=2, markersize=5)
+    
+    if heun_error_iter is not None:
+        ax.semilogy(x_vals, _finite_or_nan(heun_error_iter), '^-', label='Error Heun Iterado', linewidth=2, markersize=5)
     
     # Configuración
     ax.set_xlabel('x', fontsize=12, fontweight='bold')
@@ -170,8 +193,4 @@ def plot_error_comparison(sim_data: Dict[str, Any],
     plt.tight_layout()
     
     # Mostrar gráfica
-    try:
-        plt.show()
-    except Exception as e:
-        console.print(f"[bold red]Error al mostrar gráfica:[/bold red] {e}")
-        console.print("[dim]Intenta ejecutar desde un entorno con soporte gráfico[/dim]")
+    _show_figure(plt, fig)
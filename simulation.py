@@ -4,8 +4,9 @@ Descripción: Encapsula la lógica de orquestación de la simulación.
 Coordina la ejecución de métodos numéricos y la búsqueda de soluciones exactas.
 """
 
+import numpy as np
 from typing import Callable, Optional, Dict, Any, List, Tuple
-from numerical_methods import euler_method, improved_euler_method
+from numerical_methods import euler_method, improved_euler_method, relative_error_percent
 from function_parser import solve_exact_ode
 
 def run_simulation(method_type: str, 
@@ -15,7 +16,8 @@ def run_simulation(method_type: str,
                    y0: float, 
                    h: float, 
                    tf: float,
-                   corrector_iterations: int = 1) -> Dict[str, Any]:
+                   corrector_iterations: int = 1,
+                   n_steps: Optional[int] = None) -> Dict[str, Any]:
     """
     Ejecuta la simulación completa bajo los parámetros dados.
 
@@ -27,52 +29,89 @@ def run_simulation(method_type: str,
         h: Paso.
         tf: x final.
         corrector_iterations: Número de iteraciones del corrector (solo para HEUN).
+        n_steps: Número de pasos ya calculado por el llamador (opcional).
 
     Returns:
         Un diccionario con los resultados:
         {
             'method': str,
-            'euler_points': List or None,
-            'heun_points': List or None,
-            'heun_points_iterated': List or None,
-            'exact_points': List or None,
+            'x_values': np.ndarray or None,
+            'euler_values': np.ndarray or None,
+            'heun_values': np.ndarray or None,
+            'heun_values_iterated': np.ndarray or None,
+            'exact_points': np.ndarray or None,
+            'euler_error': np.ndarray or None (error relativo % de Euler),
+            'heun_error': np.ndarray or None (error relativo % de Heun simple),
+            'heun_error_iterated': np.ndarray or None (error relativo % de Heun iterado),
             'exact_func_str': str or None,
-            'error': str (si hubo excepción)
+            'exact_func': Callable or None (solución exacta vectorizada, para reutilizarla al graficar),
+            'error': str (si hubo excepción),
+            'warning': str (si la solución numérica contiene inf/nan)
         }
     """
     results = {
         'method': method_type,
-        'euler_points': None,
-        'heun_points': None,
-        'heun_points_iterated': None,
+        'x_values': None,
+        'euler_values': None,
+        'heun_values': None,
+        'heun_values_iterated': None,
         'exact_points': None,
+        'euler_error': None,
+        'heun_error': None,
+        'heun_error_iterated': None,
         'exact_func_str': None,
-        'error': None
+        'exact_func': None,
+        'error': None,
+        'warning': None
     }
 
     try:
         # 1. Ejecutar Método Numérico
         if method_type == 'EULER':
-            results['euler_points'] = euler_method(func, x0, y0, h, tf)
+            results['x_values'], results['euler_values'] = euler_method(func, x0, y0, h, tf, n_steps)
         elif method_type == 'HEUN':
-            heun_results = improved_euler_method(func, x0, y0, h, tf, corrector_iterations)
-            # Separar los resultados: (x, y_single, y_iterated)
-            results['heun_points'] = [(x, y_single) for x, y_single, _ in heun_results]
-            if corrector_iterations > 1:
-                results['heun_points_iterated'] = [(x, y_iter) for x, _, y_iter in heun_results]
+            xs, ys_single, ys_iter = improved_euler_method(func, x0, y0, h, tf, corrector_iterations, n_steps)
+            results['x_values'] = xs
+            results['heun_values'] = ys_single
+            # None con una sola corrección: no hay trayectoria iterada distinta
+            results['heun_values_iterated'] = ys_iter
+
+        # f no valida el dominio en cada paso: se revisa una sola vez el resultado completo.
+        numeric_series = [results['euler_values'], results['heun_values'], results['heun_values_iterated']]
+        if any(not np.isfinite(series).all() for series in numeric_series if series is not None):
+            results['warning'] = ("La solución numérica contiene valores no finitos (inf/nan): "
+                                  "f(x, y) se evaluó fuera de su dominio (ej. división por cero).")
 
         # 2. Intentar Solución Exacta
         # Solo calculamos si tenemos puntos de referencia (que deberíamos tener)
-        ref_points = results['euler_points'] if results['euler_points'] else results['heun_points']
-        
-        if ref_points:
+        xs = results['x_values']
+        if xs is not None and xs.size:
             exact_res = solve_exact_ode(func_str, x0, y0)
+            real = None
             if exact_res:
                 real_func, expr_str = exact_res
+                # Evaluar solución exacta en los mismos puntos x (una llamada vectorizada; real_func
+                # ya resuelve punto a punto lo que NumPy no puede evaluar). Si aun así falla, se
+                # sigue como sin solución exacta en lugar de descartar la solución numérica.
+                try:
+                    real = np.asarray(real_func(xs), dtype=np.float64)
+                except Exception:
+                    pass
+            if real is not None:
                 results['exact_func_str'] = expr_str
-                # Evaluar solución exacta en los mismos puntos x
-                results['exact_points'] = [real_func(p[0]) for p in ref_points]
+                results['exact_func'] = real_func
+                results['exact_points'] = real
+                # Columnas de error calculadas aquí una sola vez, junto con la solución exacta,
+                # para que la tabla solo tenga que formatearlas.
+                for values_key, error_key in (('euler_values', 'euler_error'),
+                                              ('heun_values', 'heun_error'),
+                                              ('heun_values_iterated', 'heun_error_iterated')):
+                    if results[values_key] is not None:
+                        results[error_key] = relative_error_percent(real, results[values_key])
 
+    except ArithmeticError as e:
+        # Solo en la versión Python de f (ej. división por cero); con Numba se obtiene inf/nan.
+        results['error'] = f"Error aritmético evaluando f(x, y): {e}"
     except Exception as e:
         results['error'] = str(e)
     
@@ -0,0 +1,109 @@
+"""
+Módulo: test_batch_torch.py
+Descripción: Pruebas del backend 'torch' de euler_method_batch.
+Se ejecutan con `python -m unittest discover -s tests`. Sin PyTorch instalado se usa un
+módulo `torch` mínimo respaldado por NumPy (solo lo que usa _euler_batch_torch); con
+PyTorch real, además se compara el resultado en su CPU.
+"""
+
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numerical_methods
+from function_parser import parse_function
+from numerical_methods import euler_method_batch, select_batch_backend
+
+
+class _FakeTensor(np.ndarray):
+    """Arreglo de NumPy con los métodos de tensor que usa _euler_batch_torch."""
+
+    def numel(self) -> int:
+        return self.size
+
+    def cpu(self) -> "_FakeTensor":
+        return self
+
+    def numpy(self) -> np.ndarray:
+        return np.asarray(self)
+
+
+def _fake_torch(cuda_available: bool = False) -> types.ModuleType:
+    """Módulo `torch` mínimo: as_tensor, empty, empty_like, where y las funciones de f."""
+    torch = types.ModuleType('torch')
+    as_fake = lambda a, dtype=None: np.asarray(a, dtype=dtype).view(_FakeTensor)
+    torch.__version__ = '2.0.0'  # lo consulta el printer de PyTorch de lambdify
+    torch.float64 = np.float64
+    torch.as_tensor = lambda a, dtype=None, device=None: as_fake(a, dtype)
+    torch.empty = lambda shape, dtype=None, device=None: np.empty(shape, dtype=dtype).view(_FakeTensor)
+    torch.empty_like = lambda a: np.empty_like(a).view(_FakeTensor)
+    torch.where = lambda cond, a, b: np.where(cond, a, b).view(_FakeTensor)
+    torch.sin, torch.cos, torch.exp = np.sin, np.cos, np.exp
+    torch.cuda = types.SimpleNamespace(is_available=lambda: cuda_available)
+    return torch
+
+
+def _trajectories(n: int = 64):
+    """Trayectorias con x0, h y x_end distintos: ejercita la máscara `active`."""
+    rng = np.random.default_rng(0)
+    x0 = rng.uniform(0.0, 1.0, n)
+    y0 = rng.uniform(-1.0, 1.0, n)
+    h = rng.uniform(0.01, 0.1, n)
+    x_end = x0 + rng.uniform(0.5, 2.0, n)
+    return x0, y0, h, x_end
+
+
+class TorchBatchBackendTest(unittest.TestCase):
+
+    def setUp(self):
+        self.f = parse_function("sin(x*y) - y")
+        self.params = _trajectories()
+        self.X_ref, self.Y_ref, self.n_ref = euler_method_batch(self.f, *self.params, backend='numpy')
+
+    def test_fake_torch_matches_numpy_backend(self):
+        with mock.patch.dict(sys.modules, {'torch': _fake_torch()}):
+            X, Y, n_steps = euler_method_batch(self.f, *self.params, backend='torch')
+        np.testing.assert_array_equal(n_steps, self.n_ref)
+        self.assertEqual(X.shape, self.X_ref.shape)
+        np.testing.assert_allclose(X, self.X_ref, rtol=0, atol=1e-12)
+        np.testing.assert_allclose(Y, self.Y_ref, rtol=1e-12, atol=1e-12)
+
+    def test_torch_backend_requires_parsed_function(self):
+        with mock.patch.dict(sys.modules, {'torch': _fake_torch()}):
+            with self.assertRaises(ValueError):
+                euler_method_batch(lambda x, y: x + y, *self.params, backend='torch')
+
+    def test_real_torch_cpu_matches_numpy_backend(self):
+        try:
+            import torch  # noqa: F401
+        except ImportError:
+            self.skipTest("PyTorch no está instalado")
+        X, Y, n_steps = euler_method_batch(self.f, *self.params, backend='torch')
+        np.testing.assert_array_equal(n_steps, self.n_ref)
+        np.testing.assert_allclose(X, self.X_ref, rtol=0, atol=1e-12)
+        np.testing.assert_allclose(Y, self.Y_ref, rtol=1e-12, atol=1e-12)
+
+
+class SelectBatchBackendTest(unittest.TestCase):
+
+    def test_threshold_selects_torch_with_cuda(self):
+        threshold = numerical_methods._TORCH_MIN_BATCH
+        with mock.patch.dict(sys.modules, {'torch': _fake_torch(cuda_available=True)}):
+            self.assertEqual(select_batch_backend(threshold - 1), 'numpy')
+            self.assertEqual(select_batch_backend(threshold), 'torch')
+            # El máximo de la interfaz alcanza el umbral
+            self.assertEqual(select_batch_backend(numerical_methods.MAX_BATCH_TRAJECTORIES), 'torch')
+
+    def test_without_cuda_stays_on_numpy(self):
+        with mock.patch.dict(sys.modules, {'torch': _fake_torch(cuda_available=False)}):
+            self.assertEqual(select_batch_backend(numerical_methods._TORCH_MIN_BATCH), 'numpy')
+
+
+if __name__ == '__main__':
+    unittest.main()